@@ -1,17 +1,13 @@
-import os  # Filesystem helper library used across this program to interact with the operating system's file API.
-            # - Provides functions like listdir(), path.join(), path.splitext() and others.
-            # -  Os is used to find CSV files in a folder, build full paths from directory + filename, and split file extensions.
-            # - Keeping this import at top makes these utilities available throughout the module.
+import threading  # Loads run on a worker thread so the window stays responsive; threading.Event signals cancellation.
 
-import csv  # The CSV module parses and writes comma-separated files.
-           # - csv.DictReader and csv.reader is used to read CSV rows either as dictionaries (header-aware) or plain lists.
-           # - csv.writer is also used to write rows back when saving inserted data.
-           # - Using the csv module ensures platform-consistent parsing (commas, quoting, newlines).
+import queue  # Worker threads send progress and results back to the Tk main loop through a queue.Queue.
 
 import tkinter as tk  # Tkinter is Python's standard GUI toolkit. As 'tk' is conventional and shortens code.
                      # - This import gives us widgets, and event loop.
                      # - We build the application's GUI using Tk and child widgets created from this module.
 
+from tkinter import font as tkfont  # Font metrics tell the virtual row list how many lines fit on screen.
+
 from tkinter import ttk, filedialog, messagebox  # Convenience/Stylistic imports from tkinter:
                                                  # - ttk: modern themed widgets (better visuals than classic Tk widgets).
                                                  # - filedialog: dialogs for open/save file and directory selection.
@@ -28,271 +24,34 @@ import numpy as np  # NumPy is used for numeric arrays, NaN representation, and
                    # - We use numpy arrays to compute mean/std/min/max quickly on collected numeric lists.
                    # - Using NumPy keeps operations efficent. 
 
-import matplotlib.pyplot as plt  # Matplotlib's pyplot module is used to create figures and axes for plotting.
-                                # - We create Figure and Axes objects for time series, histograms, and scatter plots.
-                                # - Matplotlib is the plotting backend used inside Tk windows via FigureCanvasTkAgg.
-
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # Adapter to embed Matplotlib figures in Tkinter windows.
-                                                                  # - FigureCanvasTkAgg wraps a Matplotlib Figure so it can be attached to a Tk widget.
-                                                                  # - This is how plot windows are integrated into the GUI rather than opened as separate Matplotlib windows.
-
-# Fields that summarise will be computed for:
-SENSOR_FIELDS = ('temperature', 'humidity', 'light')  # A tuple of field names the rest of the program expects.
-                                                     # - Used by compute_summaries to iterate over which sensor statistics to compute.
-                                                     # - Used by plotting code to know what arrays to look for.
-                                                     # - Keeping a single constant avoids mismatches caused by typos elsewhere in my code.
-
-
-# Minimal CSV reader
-def read_csv_file(filepath):  # Defines the function that reads a single CSV file and returns a list of normalized row dicts.
-                              # - Parameter: filepath (string), the path to the CSV file to parse.
-                              # - Returns: a list where each element is a dict with constant keys:
-                              #   'timestamp' (datetime or None), 'greenhouse' (string), 'temperature' (float/NaN),
-                              #   'humidity' (float/NaN), 'light' (float/NaN).
-                              # - The function tries a header-aware parse first (csv.DictReader) and falls back to column-based parse.
-
-    rows = []  # Initialises an empty list to collect parsed/normalized row dicts from the file.
-               # - I append a costant dict per input row so code below can rely on consistent keys and types.
-
-    with open(filepath, newline='') as f:  # Opens the file using a context manager "with" (which ensures the file is closed automatically).
-                                           # - newline='' is used for the csv module to handle universal newlines correctly.
-                                           # - 'f' is the file object visible inside this block only. Defining it as such improves efficency and readability. 
-        reader = csv.DictReader(f)  # Creates a DictReader that will interpret the first non-empty row as header names.
-                                    # - DictReader yields an OrderedDict per row. 
-                                    # - This enables header-aware parsing so we can accept different column orders.
-
-        fieldnames = reader.fieldnames or []  # Grabs the header names detected by DictReader; if none, use an empty list.
-                                              # - Using "or []" (Empty List) avoids NoneType errors in subsequent code when there are no headers.
-
-        norm_fieldnames = [fn.lower().strip() for fn in fieldnames if fn]
-        # - This is a list comprehension that iterates over each header string (fn) in fieldnames.
-        # - For each header: fn.lower() converts all letters to lowercase so matching is case-insensitive.
-        # - .strip() removes leading/trailing whitespace so headers like " temperature " are handled.
-        # - The "if fn" filters out falsy header values (e.g., None or empty strings) so we don't process invalid headers.
-        # - The result (norm_fieldnames) is a cleaned list of header names used to decide how to parse the file.
-
-        expected_tokens = {'timestamp', 'temperature', 'temp', 'humidity', 'hum',
-                           'light', 'lux', 'greenhouse', 'gh', 'light_intensity'}
-        # A set of substrings we expect to find in the headers within the CSV file that contains our sensor/timestamp data.
-        # - We include common synonyms ('temp' for 'temperature', 'lux' for 'light') so small differences in CSV headers dosen't break detection.
-
-        header_has_expected = any(any(tok in fn for tok in expected_tokens) for fn in norm_fieldnames)
-        # - Outer any(...) iterates over each normalized header name (fn).
-        # - For each fn, inner any(tok in fn for tok in expected_tokens) checks whether any of our expected tokens appear inside that header string.
-        # - If any header contains any expected token, header_has_expected becomes True.
-        # - This helps decide whether to use the header-aware DictReader parsing (if True) or a fallback positional parse (if False).
-
-    if header_has_expected:  # If the header detection found expected tokens, parse the file in header-aware mode.
-        with open(filepath, newline='') as f:  # Re-open the file so we can iterate from the beginning again with DictReader.
-                                           # - Re-opening is simpler than rewinding the file object and ensures we read rows fresh.
-            reader = csv.DictReader(f)  # Creates a new DictReader to iterate rows now that we've committed to header-aware parsing.
-            for r in reader:  # Iterates each row produced by DictReader; r is a dictionary mapping header.
-                if not any((v and str(v).strip()) for v in r.values()):
-                    # - r.values() are the cell values for the row (They may be strings or None).
-                    # - The generator (v and str(v).strip()) returns a truthy trimmed string if v exists and isn't just whitespace.
-                    # - any(...) returns True if at least one cell contains non-whitespace content.
-                    # -  The test is negated and 'continue's when the entire row is empty or contains only whitespace values.
-                    # - This avoids creating meaningless rows for blank lines in CSVs.
-
-                    continue  # Skips processing for empty rows; moves to next row in the file.
-
-                row = {k.strip().lower(): v.strip() if isinstance(v, str) else v for k, v in r.items()}
-                # - r.items() yields (header_name, cell_value) pairs with the original header strings as keys.
-                # -   A new dict 'row' is created where each key is header_name.lower().strip() to make key lookup case insensitive and whitespace flexible.
-                # - For values: if the value is a string we call .strip() to remove accidental spaces; non-strings are passed through unchanged.
-                # - This normalized row makes downstream parsing simpler: we can get('temperature') or get('temp') without worrying about capitalization.
-
-                timestamp = None  # Initializes the timestamp variable; where it will attempt to parse below.
-                                  # - Setting to None explicitly clarifies that a missing/unparseable timestamp is represented as None.
-
-                if 'timestamp' in row and row['timestamp']:
-                    # If there is a 'timestamp' key and it has a non-empty value, try to parse it into a datetime object.
-                    # - datetime.fromisoformat is perfered, which handles standard ISO formats quickly.
-                    try:
-                        timestamp = datetime.fromisoformat(row['timestamp'])
-                        # datetime.fromisoformat parses strings in ISO-8601-like formats such as:
-                        # - 'YYYY-MM-DD' and 'YYYY-MM-DDTHH:MM:SS' and variations.
-                        # - Using ISO parsing first handles many automated sensor timestamp formats.
-                    except Exception:
-                        # If fromisoformat fails (string isn't ISO or is malformed), try a common custom format next.
-                        try:
-                            timestamp = datetime.strptime(row['timestamp'], '%Y-%m-%d %H:%M:%S')
-                            # strptime with format '%Y-%m-%d %H:%M:%S' matches '2020-01-31 23:59:59' which is a common export format.
-                        except Exception:
-                            timestamp = None  # If parsing fails completely, leave timestamp as None (treat as missing).
-
-                greenhouse = row.get('greenhouse', row.get('gh', 'unknown'))
-                # -  Tries canonical key 'greenhouse' first.
-                # - If not found, fallback to a common synonym 'gh'.
-                # - If neither exists, default to the string 'unknown' so the field is never None (helps later when saving/displaying).
-
-                try:
-                    temp = float(row.get('temperature', row.get('temp', 'nan')))
-                    # Trying to convert temperature to a float using canonical key 'temperature' then synonym 'temp'.
-                    # - If both are missing row.get(..., 'nan') returns the string 'nan', and float('nan') yields np.nan-like float nan.
-                except Exception:
-                    temp = np.nan  # If Conversion fails (non-numeric string, empty, etc.), set to NumPy NaN for consistent numeric missingness.
-
-                try:
-                    hum = float(row.get('humidity', row.get('hum', 'nan')))
-                    # Converts humidity similarly using canonical and synonym keys.
-                except Exception:
-                    hum = np.nan  # Uses NumPy NaN when conversion fails.
-
-                try:
-                    light_raw = row.get('light', row.get('light_intensity', row.get('lux', 'nan')))
-                    # For light we check multiple possible header names and choose the first that exists.
-                    light = float(light_raw)  # Converts the selected string to a float.
-                except Exception:
-                    light = np.nan  # If conversion fails or value is missing, use NaN.
-
-                rows.append({'timestamp': timestamp, 'greenhouse': greenhouse,
-                             'temperature': temp, 'humidity': hum, 'light': light})
-                # Appends a canonical dict to rows so every stored row has the same keys and types:
-                # - 'timestamp' is either datetime or None
-                # - 'greenhouse' is a string
-                # - numeric fields are floats or np.nan
-
-        return rows  # Returns the list of parsed rows when header-aware parsing was used.
-
-    # If it reaches this point, the heuristic didn't find expected header tokens.
-    # Now fall back to header-less parsing using csv.reader which returns lists of columns per row.
-    with open(filepath, newline='') as f:  # Open the file again for fallback parsing mode.
-        reader = csv.reader(f)  # csv.reader yields each row as a list of column strings.
-        for cols in reader:  # Iterate every row list returned by csv.reader.
-            if not cols or all((c is None or str(c).strip() == '') for c in cols):
-                # Skip rows that are entirely empty or contain only whitespace values.
-                # - 'cols' can be empty (no columns) or have values that are None/whitespace.
-                # - all(...) returns True when every column is effectively empty, so we continue to the next row.
-                continue
-
-            cols = [c.strip() for c in cols]  # Strip whitespace from each column string to clean the data.
-                                              # - This removes leading/trailing spaces from values like "  23.5  ".
-
-            # pad to 5
-            while len(cols) < 5:
-                cols.append('')  # If a row has fewer than 5 columns, append empty strings so the unpack below won't fail.
-                                # - This supports files where some rows are missing trailing values but still keep column positions stable.
-
-            ts_raw, greenhouse, temp_raw, hum_raw, light_raw = cols[:5]
-            # Unpacks the first five columns into specific variables.
-            # - ts_raw: raw timestamp string (may be empty)
-            # - greenhouse: greenhouse id field (may be empty)
-            # - temp_raw, hum_raw, light_raw: raw numeric strings for sensors (may be empty)
-
-            timestamp = None  # Default timestamp to None before trying to parse.
-
-            if ts_raw:  # Only tries parsing if ts_raw is a non-empty string.
-                try:
-                    timestamp = datetime.fromisoformat(ts_raw)  # Tries ISO parsing first for robustness.
-                except Exception:
-                    try:
-                        timestamp = datetime.strptime(ts_raw, '%Y-%m-%d %H:%M:%S')
-                        # If ISO parsing fails, try the common 'YYYY-MM-DD HH:MM:SS' format as fallback.
-                    except Exception:
-                        timestamp = None  # If both attempts fail, keep timestamp as None to indicate missing/unparseable.
-
-            try:
-                temp = float(temp_raw) if temp_raw != '' else np.nan
-                # Converts temperature string to float if non-empty; otherwise use NaN to represent missing numeric.
-            except Exception:
-                temp = np.nan  # If conversion throws, use NaN.
-
-            try:
-                hum = float(hum_raw) if hum_raw != '' else np.nan
-                # Converts humidity string to float if non-empty; otherwise NaN.
-            except Exception:
-                hum = np.nan  # On conversion failure use NaN.
-
-            try:
-                light = float(light_raw) if light_raw != '' else np.nan
-                # Converts light string to float if non-empty; otherwise NaN.
-            except Exception:
-                light = np.nan  # On conversion failure use NaN.
-
-            rows.append({'timestamp': timestamp, 'greenhouse': greenhouse or 'unknown',
-                         'temperature': temp, 'humidity': hum, 'light': light})
-            # Appends a normalized dictionary with canonical keys to rows.
-            # - greenhouse or 'unknown' ensures greenhouse is never an empty string but at least 'unknown' if missing.
-
-    return rows  # Returns the parsed rows collected from the fallback column-based parsing.
-
-
-def read_all_csv_in_dir(dirpath):  # Reads and combine rows from all CSV files in a directory.
-    # - Parameter: dirpath (string) path of a directory to scan.
-    # - Returns: a combined list of normalized rows from every CSV in the directory.
-    combined = []  # Initializes an accumulator list to which we will extend rows from each CSV file we find.
-
-    for fname in os.listdir(dirpath):  # Uses os.listdir to iterate every entry name in the target directory.
-        # os.listdir returns filenames (not full paths), so we join them with the directory below.
-        if fname.lower().endswith('.csv'):  # Processes only files whose names end with '.csv' (case-insensitive).
-            full = os.path.join(dirpath, fname)  # Builds the absolute or relative path to the file by joining dirpath and filename.
-            try:
-                combined.extend(read_csv_file(full))  # Reads the CSV file and extend combined with its rows (list concatenation).
-            except Exception as e:
-                print(f"Failed to read {full}: {e}")  # If reading a file fails, print an error message and continue with others.
-                # - There is no raise here so a single bad CSV won't stop the whole directory load operation.
-
-    return combined  # Returns the combined list of rows from all CSV files that were successfully read.
+# - Matplotlib isn't imported here: PlotWindow imports it when the first graph window opens. pyplot and the Tk backend
+#   took about 0.6 s, roughly three quarters of the time before the main window could appear, and a session that never
+#   opens the Graph tab doesn't need them at all.
 
+# The data side: readers, SensorFrame, summaries, the store and plotting live in greenhouse.py so the command line
+# can use them without tkinter or a display. Named one by one so pyflakes can check this module's names.
+from greenhouse import (ANOMALY_KINDS, DECIMATE_MODES, DENSITY_THRESHOLD, GRAPH_OPTIONS, PROFILER, RESAMPLE_BUCKETS,
+                        ROLLING_OVERLAYS, ROLLING_WINDOWS, SENSOR_FIELDS, SUMMARY_QUANTILES, TAIL_POLL_MS,
+                        AnomalyDetector, CsvCache, DirectoryTail, LoadCancelled, SensorFrame, SensorStore,
+                        SensorSummary, TimeIndex, anomaly_bit, describe_anomalies, draw_graph, format_bulk_report,
+                        format_group_table, format_load_report, format_store_report, graph_artists, group_by,
+                        load_csv_dir_cached, load_csv_file_cached, parquet_available, parse_bulk_rows,
+                        parse_timestamp_column, prepare_plot_data, save_columns, save_group_table, update_graph)
 
-# Summaries & conversion
-def compute_summaries(rows):  # Computes basic statistics (count, mean, std, min, max) for each field in SENSOR_FIELDS.
-    """
-    For each field in SENSOR_FIELDS compute: count, mean, std, min, max.
-    Non-numeric or missing values are ignored.
-    """
-    summaries = {}  # Dictionary to hold summary statistics per sensor field.
-
-    for field in SENSOR_FIELDS:  # Iterates the canonical fields, e.g., 'temperature', 'humidity', 'light'.
-        vals = []  # Collects numeric values for this field across all rows here.
 
-        for r in rows:  # Iterates over each normalized row dict passed to the function.
-            try:
-                v = r.get(field, np.nan)  # Tries to retrieve the value for the field, default to np.nan if missing.
-                vf = float(v)  # Attempts to coerce the value to a Python float.
-                if np.isfinite(vf):  # Checks that the result is a finite number (not NaN or +/-inf).
-                    vals.append(vf)  # Only appends finite numeric values so NaNs and infinities are excluded.
-            except Exception:
-                # If any error occurs (e.g., v is a non-numeric string), we silently skip that row for this metric.
-                continue
-
-        if len(vals) == 0:  # If no valid numeric values were found for this field:
-            summaries[field] = {'count': 0, 'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
-            # - Use np.nan for numeric stats to indicate 'no data' consistently with how missing numbers are represented elsewhere.
-        else:
-            arr = np.array(vals, dtype=float)  # Converts the collected list to a NumPy array for efficient stats.
-            summaries[field] = {
-                'count': int(arr.size),  # Number of valid numeric values included in calculations.
-                'mean': float(np.mean(arr)),  # Arithmetic mean of the collected values.
-                'std': float(np.std(arr, ddof=0)),  # Population standard deviation (ddof=0). Use ddof=1 for sample std if desired.
-                'min': float(np.min(arr)),  # Minimum value observed.
-                'max': float(np.max(arr))  # Maximum value observed.
-            }
-
-    return summaries  # Returns the mapping field and statistics dict so callers can display or save the results.
-
-
-def rows_to_numpy(rows):  # Converts normalized row dicts into arrays suitable for plotting and numeric operations.
-    """Return times (list) and numpy arrays for temperature, humidity, light."""
-    # - times is a Python list preserving original order; elements are either datetime objects or None for missing timestamps.
-    # - temps, hums, lights are NumPy arrays of dtype float where missing values are represented by np.nan.
-    times = [r.get('timestamp') if r.get('timestamp') is not None else None for r in rows]
-    # - This comprehension produces an ordered list of timestamp objects or None to preserve row alignment with numeric arrays.
-
-    temps = np.array([r.get('temperature', np.nan) for r in rows], dtype=float)
-    # - Creates a NumPy float array of temperature values; r.get('temperature', np.nan) yields numeric or np.nan for missing.
-
-    hums = np.array([r.get('humidity', np.nan) for r in rows], dtype=float)
-    # - Similar conversion for humidity.
+# GUI Application
+OPEN_FILETYPES = [('Data files', '*.csv *.npz *.parquet'), ('CSV files', '*.csv'), ('NumPy columns', '*.npz'),
+                  ('Parquet files', '*.parquet'), ('All files', '*.*')]
+# - Every file type the loaders read; .npz and .parquet hold the columns in binary (see save_binary_columns).
 
-    lights = np.array([r.get('light', np.nan) for r in rows], dtype=float)
-    # - Similar conversion for light sensor values.
 
-    return times, temps, hums, lights  # Returns tuple of times list and three numeric arrays in the canonical order expected by plots.
+def save_filetypes():  # File types offered when saving rows; Parquet only when pyarrow is installed.
+    types = [('CSV files', '*.csv'), ('TSV files', '*.tsv'), ('Text files', '*.txt'), ('NumPy columns', '*.npz')]
+    if parquet_available():
+        types.append(('Parquet files', '*.parquet'))
+    return types
 
 
-# GUI Application
 class CowApp(tk.Tk):  # Main application class; inherits from Tk so an instance represents the main window and event loop.
     def __init__(self):  # Constructor builds the UI and initializes shared state.
         super().__init__()  # Initializes the base Tk class which creates a new main window and initializes Tk resources.
@@ -305,10 +64,36 @@ class CowApp(tk.Tk):  # Main application class; inherits from Tk so an instance
         # - Sets a default window size (width x height in pixels).
         # - This makes the initial layout predictable; users can still resize the window.
 
-        self.inserted_rows = []  
-        # - A list stored on the app instance that will hold rows created via the InsertTab.
+        self.inserted_rows = SensorFrame()
+        # - A columnar SensorFrame stored on the app instance that will hold rows created via the InsertTab.
+        # - It behaves like the old list of row dicts (append, len, indexing, iteration) at a fraction of the memory.
         # - Storing this on the app allows different tabs to access and manipulate the same dataset.
 
+        self.inserted_summary = SensorSummary()
+        # - Running statistics for inserted_rows, updated in O(1) per inserted row so processing never rescans the list.
+
+        self.detector = AnomalyDetector()
+        # - Streaming anomaly checks fed by every inserted row and every directory imported into the store.
+
+        self.inserted_flags = {}
+        # - Anomaly flags of inserted rows, by row index; only flagged rows are kept (anomalies are rare).
+
+        self.csv_cache = CsvCache()
+        # - Parsed CSVs are cached on disk, so re-loading an unchanged file or directory skips parsing entirely.
+
+        self.store = None
+        # - Durable append-only store of readings; inserted rows and imported directories can be written to it
+        #   and both the Process and Graph tabs can load from it.
+        # - Opened by open_store() the first time one of those is asked for, so nothing is written to the home
+        #   directory unless the user uses the store.
+
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
+        # - Runs on_close when the window's close button is pressed so pending store writes are flushed.
+
+        self.force_reparse = tk.BooleanVar(value=False)
+        # - Shared by the "Force re-parse" checkboxes on the Process and Graph tabs; when ticked the cache is bypassed
+        #   (and refreshed) on the next load.
+
         notebook = ttk.Notebook(self)
         # - Creates a Notebook widget which provides a tabbed interface for organizing different functional parts of the app.
 
@@ -334,9 +119,369 @@ class CowApp(tk.Tk):  # Main application class; inherits from Tk so an instance
         notebook.add(self.graph_tab, text='View Graphs')
         # - Adds the GraphTab with label 'View Graphs' so users can switch between app sections by clicking tabs.
 
+    def open_store(self):  # The reading store, opened on first use; None (after telling the user) if it can't be.
+        if self.store is None:
+            try:
+                self.store = SensorStore()
+            except OSError as e:  # The app still works without the store (e.g. read-only home directory).
+                messagebox.showerror('Store unavailable', f'Reading store could not be opened: {e}')
+        return self.store
+
+    def on_close(self):  # Flushes the reading store to disk before the window is destroyed.
+        if self.store is not None:
+            self.store.close()
+        self.destroy()
+
+
+# Time range controls
+class RangeBar(ttk.Frame):  # Start/end/greenhouse controls shared by the Process and Graph tabs.
+    def __init__(self, parent):
+        super().__init__(parent)
+        self._index = None  # TimeIndex for the frame last sliced; rebuilt only when the data changes.
+
+        ttk.Label(self, text='From:').pack(side='left')
+        self.start_var = tk.StringVar()  # Blank means "from the first reading".
+        ttk.Entry(self, textvariable=self.start_var, width=18).pack(side='left', padx=4)
+
+        ttk.Label(self, text='To:').pack(side='left')
+        self.end_var = tk.StringVar()  # Blank means "up to the last reading"; the end time itself is excluded.
+        ttk.Entry(self, textvariable=self.end_var, width=18).pack(side='left', padx=4)
+
+        ttk.Label(self, text='Greenhouse:').pack(side='left')
+        self.gh_var = tk.StringVar(value='All')
+        self.gh_box = ttk.Combobox(self, textvariable=self.gh_var, values=['All'], width=12, state='readonly')
+        self.gh_box.pack(side='left', padx=4)
+
+        self.last_day_button = ttk.Button(self, text='Last 24h')
+        self.last_day_button.pack(side='left', padx=4)
+        # - The owning tab wires this up with set_last_day, since only it knows which dataset is current.
+
+    def index_for(self, frame):  # Returns a TimeIndex for frame, reusing the cached one when frame hasn't changed.
+        if self._index is None or not self._index.is_current(frame):
+            self._index = TimeIndex(frame)
+            self.gh_box['values'] = ['All'] + list(frame.categories)
+            if self.gh_var.get() not in self.gh_box['values']:
+                self.gh_var.set('All')
+        return self._index
+
+    def set_last_day(self, frame):  # Fills the controls with the 24 hours up to the newest reading in frame.
+        if not frame:
+            return
+        index = self.index_for(frame)
+        if index.last is None:
+            return
+        end = index.last + np.timedelta64(1, 'us')  # The end is exclusive, so step past the newest reading.
+        self.start_var.set(str((index.last - np.timedelta64(1, 'D')).astype('datetime64[s]')).replace('T', ' '))
+        self.end_var.set(str(end.astype('datetime64[us]')).replace('T', ' '))
+
+    def is_active(self):  # True when any control narrows the data.
+        return bool(self.start_var.get().strip() or self.end_var.get().strip() or self.gh_var.get() != 'All')
+
+    def apply(self, frame):  # Returns the rows of frame inside the selected range, or None after showing an error.
+        rows = self.select(frame)
+        if rows is None:
+            return None
+        return frame if isinstance(rows, slice) else frame.take(rows)
+
+    def select(self, frame):  # Row numbers of frame inside the selected range (slice(None) for all), None on error.
+        # - Lets callers cut arrays aligned with frame, such as anomaly flags, down to the same rows.
+        if not self.is_active():
+            return slice(None)  # No restriction: nothing to look up.
+        bounds = []
+        for label, var in (('From', self.start_var), ('To', self.end_var)):
+            text = var.get().strip()
+            if not text:
+                bounds.append(None)
+                continue
+            ts = parse_timestamp_column([text])[0]
+            if np.isnat(ts):
+                messagebox.showerror('Error', f'{label}: unrecognized timestamp. Use ISO or YYYY-MM-DD HH:MM:SS')
+                return None
+            bounds.append(ts)
+        gh = self.gh_var.get()
+        return self.index_for(frame).range(bounds[0], bounds[1], None if gh == 'All' else [gh])
+
+
+# Virtual row list
+def format_row(row):  # The one-line text shown for a row in the inserted-rows list.
+    ts = row['timestamp']
+    return str((ts.isoformat(sep=' ') if ts is not None else '', row['greenhouse'],
+                row['temperature'], row['humidity'], row['light']))
+
+
+class VirtualRowList(ttk.Frame):  # Scrollable list that only renders the rows currently on screen.
+    """
+    Virtualised view of a SensorFrame (or anything with len() and indexing).
+
+    The Listbox only ever holds the handful of lines that fit in the window.
+    Scrolling moves an offset into the data and re-formats just those lines,
+    so scrolling and redraw cost the same with ten rows or ten million, and
+    no per-row strings are kept in memory. Selection is tracked as indexes
+    into the data, not as widget lines.
+    """
+
+    HIGHLIGHT = '#ffd6d6'  # Background of flagged rows.
+
+    def __init__(self, parent, get_rows, formatter=format_row, get_flags=None):
+        super().__init__(parent)
+        self.get_rows = get_rows  # Callable returning the current data (looked up on every refresh).
+        self.get_flags = get_flags  # Optional callable returning {row index: flags}; flagged rows are highlighted.
+        self.formatter = formatter
+        self.top = 0  # Index of the first data row shown.
+        self.selected = set()  # Data indexes of the selected rows.
+
+        self.listbox = tk.Listbox(self, height=10, selectmode='extended', exportselection=False)
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.listbox.bind('<Configure>', lambda e: self.refresh())  # Re-render when resized (more or fewer lines fit).
+        self.listbox.bind('<<ListboxSelect>>', self._on_select)
+        self.listbox.bind('<MouseWheel>', self._on_wheel)  # Windows and macOS.
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-3) or 'break')  # X11 wheel up.
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(3) or 'break')  # X11 wheel down.
+
+    def visible_lines(self):  # How many rows fit in the listbox at its current size.
+        line = tkfont.Font(font=self.listbox['font']).metrics('linespace') + 1 + 2 * int(self.listbox['selectborderwidth'])
+        return max(1, self.listbox.winfo_height() // line) if self.listbox.winfo_ismapped() else int(self.listbox['height'])
+
+    def refresh(self):  # Redraws the visible window of rows from the data.
+        rows = self.get_rows()
+        n = len(rows)
+        visible = self.visible_lines()
+        self.top = max(0, min(self.top, n - visible))
+        end = min(n, self.top + visible)
+        self.listbox.delete(0, 'end')
+        self.listbox.insert('end', *[self.formatter(rows[i]) for i in range(self.top, end)])
+        flags = self.get_flags() if self.get_flags is not None else {}
+        for i in range(self.top, end):
+            if flags.get(i):
+                self.listbox.itemconfig(i - self.top, background=self.HIGHLIGHT)
+        for i in range(self.top, end):
+            if i in self.selected:
+                self.listbox.selection_set(i - self.top)
+        if n:
+            self.scrollbar.set(self.top / n, end / n)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, lines):  # Moves the window by a number of rows (negative is up).
+        self.top += lines
+        self.refresh()
+
+    def scroll_to_end(self):  # Shows the newest rows (used after inserting).
+        self.top = len(self.get_rows())
+        self.refresh()
+
+    def clear_selection(self):
+        self.selected.clear()
+        self.refresh()
+
+    def selected_indices(self):  # Selected data indexes in ascending order.
+        return sorted(self.selected)
+
+    def _on_scrollbar(self, action, amount, unit=None):  # Translates scrollbar commands into a new top row.
+        n = len(self.get_rows())
+        if action == 'moveto':
+            self.top = int(float(amount) * n)
+        elif action == 'scroll':
+            step = self.visible_lines() if unit == 'pages' else 1
+            self.top += int(amount) * step
+        self.refresh()
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return 'break'  # Stop the Listbox's own scrolling, which only knows about the few lines it holds.
+
+    def _on_select(self, _event):  # Mirrors the Listbox selection of the visible lines into self.selected.
+        current = set(self.listbox.curselection())
+        for line in range(self.listbox.size()):
+            if line in current:
+                self.selected.add(self.top + line)
+            else:
+                self.selected.discard(self.top + line)
+
+
+# Performance panel
+class PerformancePanel(ttk.LabelFrame):  # Switches for the stage profiler and a table of what each stage cost.
+    """
+    Front end for greenhouse.PROFILER.
+
+    Profiling is off by default; while it is off the instrumented stages
+    cost next to nothing. Once enabled, every load, summary, group, anomaly
+    pass, plot preparation and render adds to a per-stage row: calls, total
+    seconds, rows, rows per second, MB per second and (with tracemalloc on)
+    peak traced memory. Export writes the same numbers, plus any cProfile
+    captures, as JSON.
+    """
+    COLUMNS = (('calls', 50), ('seconds', 70), ('rows', 90), ('rows/s', 90), ('MB/s', 60), ('peak MB', 70))
+
+    def __init__(self, parent):
+        super().__init__(parent, text='Performance')
+        bar = ttk.Frame(self)
+        bar.pack(fill='x')
+
+        self.enabled_var = tk.BooleanVar(value=PROFILER.enabled)
+        self.memory_var = tk.BooleanVar(value=PROFILER.capture_memory)
+        self.profile_var = tk.BooleanVar(value=PROFILER.capture_profile)
+        for text, var in (('Profile stages', self.enabled_var), ('Peak memory (tracemalloc)', self.memory_var),
+                          ('Function profile (cProfile)', self.profile_var)):
+            ttk.Checkbutton(bar, text=text, variable=var, command=self.apply_options).pack(side='left', padx=(0, 6))
+        # - Memory and function capture only take effect while stage profiling is on; both slow the pipeline down.
+
+        ttk.Button(bar, text='Refresh', command=self.refresh).pack(side='left', padx=4)
+        ttk.Button(bar, text='Reset', command=self.reset).pack(side='left', padx=4)
+        ttk.Button(bar, text='Show Profile', command=self.show_profile).pack(side='left', padx=4)
+        ttk.Button(bar, text='Export JSON', command=self.export_json).pack(side='left', padx=4)
+
+        self.tree = ttk.Treeview(self, columns=[c for c, _ in self.COLUMNS], height=5)
+        self.tree.heading('#0', text='stage')
+        self.tree.column('#0', width=180)
+        for name, width in self.COLUMNS:
+            self.tree.heading(name, text=name)
+            self.tree.column(name, width=width, anchor='e')
+        self.tree.pack(fill='x', pady=(4, 0))
+
+    def apply_options(self):
+        PROFILER.configure(self.enabled_var.get(), self.memory_var.get(), self.profile_var.get())
+
+    def refresh(self):  # Redraws the table from the profiler's current totals.
+        self.tree.delete(*self.tree.get_children())
+        for t in PROFILER.report():
+            peak = '' if t['peak_mb'] is None else f"{t['peak_mb']:.1f}"
+            self.tree.insert('', 'end', text=t['stage'],
+                             values=(t['calls'], f"{t['seconds']:.3f}", f"{t['rows']:,}",
+                                     f"{t['rows_per_s'] or 0:,.0f}", f"{t['mb_per_s'] or 0:.1f}", peak))
+
+    def reset(self):
+        PROFILER.clear()
+        self.refresh()
+
+    def show_profile(self):  # Opens the cProfile capture of the selected stage (or every capture) in a window.
+        profiles = PROFILER.profiles
+        selected = [self.tree.item(i, 'text') for i in self.tree.selection()]
+        names = [n for n in selected if n in profiles] or list(profiles)
+        if not names:
+            messagebox.showinfo('No profile', 'Tick "Function profile (cProfile)" and run a load or plot first.')
+            return
+        win = tk.Toplevel(self)
+        win.title('Function profile')
+        text = tk.Text(win, wrap='none', font=('Courier', 9))
+        text.pack(fill='both', expand=True)
+        text.insert('end', '\n\n'.join(f'== {n} ==\n{profiles[n]}' for n in names))
+
+    def export_json(self):
+        f = filedialog.asksaveasfilename(defaultextension='.json', filetypes=[('JSON File', '*.json')])
+        if not f:
+            return
+        try:
+            PROFILER.save_json(f)
+        except OSError as e:
+            messagebox.showerror('Error', f'Export failed: {e}')
+            return
+        messagebox.showinfo('Saved', f'Stage timings saved to {f}')
+
+
+# Background loads
+class LoadProgress(ttk.Frame):  # Progress bar, status text and Cancel button for jobs run off the Tk thread.
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.progress = ttk.Progressbar(self, mode='determinate', maximum=1.0, length=300)
+        self.progress.pack(side='left')
+        # - Filled by bytes read out of the total bytes of the file(s) being loaded.
+
+        self.label = ttk.Label(self, text='')  # Files done, rows parsed and MB read.
+        self.label.pack(side='left', padx=6)
+
+        self.cancel_button = ttk.Button(self, text='Cancel', command=self.cancel, state='disabled')
+        self.cancel_button.pack(side='left')
+
+        self._load_cancel = None  # threading.Event of the running load, None when idle.
+        self._load_queue = None  # queue.Queue the running load reports progress and its result through.
+        self._buttons = ()
+
+    def run(self, job, on_done, buttons=()):  # Runs job(progress, cancel) on a worker thread, then on_done(result) here.
+        # - job must not touch any Tk widget; it only reports through the progress callback, which goes via a queue.
+        # - on_done runs on the Tk main thread once the job finishes. If the job is cancelled or fails on_done never
+        #   runs, so a partial result can never replace the data already loaded.
+        if self._load_cancel is not None:
+            messagebox.showwarning('Busy', 'A load is already running.')
+            return
+        self._load_cancel = cancel = threading.Event()
+        self._load_queue = results = queue.Queue()
+
+        def worker():
+            try:
+                result = job(lambda info: results.put(('progress', info)), cancel)
+            except LoadCancelled:
+                results.put(('cancelled', None))
+            except Exception as e:
+                results.put(('error', e))
+            else:
+                results.put(('done', result))
+
+        self._buttons = buttons  # Load buttons of the owning tab, disabled until the job ends.
+        for button in buttons:
+            button.configure(state='disabled')
+        self.cancel_button.configure(state='normal')
+        self.progress['value'] = 0
+        self.label.configure(text='Starting...')
+        threading.Thread(target=worker, daemon=True).start()
+        # - daemon=True so a load still running when the window is closed doesn't keep the program alive.
+        self.after(LOAD_POLL_MS, self._poll, on_done)
+
+    def _poll(self, on_done):  # Drains the load queue on the Tk main thread (scheduled with after()).
+        latest = None
+        final = None
+        while True:
+            try:
+                kind, payload = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                latest = payload  # Only the newest progress matters; older ones are skipped.
+            else:
+                final = (kind, payload)
+
+        if latest is not None:
+            total = latest['bytes_total'] or 1
+            self.progress['value'] = min(1.0, latest['bytes'] / total)
+            self.label.configure(text=f"{latest['files_done']}/{latest['files_total']} files, "
+                                      f"{latest['rows']:,} rows, {latest['bytes'] / 1e6:.1f} MB read")
+        if final is None:
+            self.after(LOAD_POLL_MS, self._poll, on_done)
+            return
+
+        self._load_cancel = None
+        self._load_queue = None
+        for button in self._buttons:
+            button.configure(state='normal')
+        self.cancel_button.configure(state='disabled')
+        kind, payload = final
+        if kind == 'done':
+            self.progress['value'] = 1.0
+            self.label.configure(text='Done')
+            on_done(payload)
+        elif kind == 'cancelled':
+            self.progress['value'] = 0
+            self.label.configure(text='Cancelled')  # The partial result was dropped with the worker's stack.
+        else:
+            self.progress['value'] = 0
+            self.label.configure(text='Failed')
+            messagebox.showerror('Error', f'Loading failed: {payload}')
+
+    def cancel(self):  # Asks the running load to stop; it does so at the next chunk or finished batch of files.
+        if self._load_cancel is not None:
+            self._load_cancel.set()
+            self.label.configure(text='Cancelling...')
+
 
 # Insert Tab
 class InsertTab(tk.Frame):  # Frames responsible for manual data entry (inserting rows through the GUI).
+    SORT_KEYS = {'Lowest Humidity': ('humidity', False), 'Highest Humidity': ('humidity', True),
+                 'Lowest Temperature': ('temperature', False), 'Highest Temperature': ('temperature', True)}
+    # - Sort option label -> (column, descending) for save_sorted.
+
     def __init__(self, parent, app: CowApp):  # parent is the notebook tab container; app is the main application instance.
         super().__init__(parent)  # Initializes base Frame widget with the notebook as parent.
         self.app = app  # Saves reference to the main app so we can append rows to app.inserted_rows and trigger shared behavior.
@@ -399,6 +544,14 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
         ttk.Button(form, text='Clear Inputs', command=self.clear_inputs).grid(row=5, column=1)
         # - Button to clear the form fields via clear_inputs method.
 
+        self.write_store_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form, text='Also write to store', variable=self.write_store_var).grid(row=5, column=2, sticky='w')
+        # - When ticked every inserted row is also appended to the durable reading store. Off by default: the store
+        #   lives in the home directory and is only written when asked for.
+
+        ttk.Button(form, text='Bulk Insert...', command=self.open_bulk_insert).grid(row=6, column=0, pady=(0, 6))
+        # - Opens a window for pasting or loading many readings and inserting them in one batch.
+
         sort_frame = ttk.Frame(self)  # Create a frame to host sorting controls and save button.
         sort_frame.pack(side='top', fill='x', padx=10, pady=8)
         # - Packs near the top under the form so these controls are grouped visually.
@@ -406,7 +559,7 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
         ttk.Label(sort_frame, text='Sort before saving:').pack(side='left')
         # - Explain the sort behavior: the user can request the inserted rows be sorted by specified metrics before saving.
 
-        self.sort_options = ('Lowest Humidity', 'Highest Humidity', 'Lowest Temperature', 'Highest Temperature')
+        self.sort_options = tuple(self.SORT_KEYS)
         # - A tuple of human-readable sort option labels.
 
         self.sort_var = tk.StringVar(value=self.sort_options[0])
@@ -428,11 +581,13 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
         ttk.Label(bottom, text='Inserted rows (most recent at bottom):').pack(anchor='w')
         # - A short label above the listbox explaining the display order.
 
-        self.listbox = tk.Listbox(bottom, height=10)
-        # - The Listbox displays the rows inserted via the form; height sets how many lines are visible by default.
+        self.row_list = VirtualRowList(bottom, lambda: self.app.inserted_rows, get_flags=lambda: self.app.inserted_flags)
+        # - Displays the rows inserted via the form, reading them straight from app.inserted_rows.
+        # - Only the lines that fit on screen are formatted, so it stays fast however many rows are inserted.
+        # - Rows the anomaly detector flagged are highlighted.
 
-        self.listbox.pack(fill='both', expand=True)
-        # - Packs the listbox so it expands to use the bottom frame.
+        self.row_list.pack(fill='both', expand=True)
+        # - Packs the list so it expands to use the bottom frame.
 
         ttk.Button(bottom, text='Return Selected Values', command=self.return_selected).pack(pady=6)
         # - Button to open a dialog showing the currently selected listbox entries (useful for copying or inspection).
@@ -449,17 +604,13 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
             ts = datetime.now()
             # - If no timestamp provided, use current local time so every inserted row has at least a timestamp.
         else:
-            try:
-                ts = datetime.fromisoformat(tstr)
-                # - Tries parsing an ISO-like string first (handles many standard formats).
-            except Exception:
-                try:
-                    ts = datetime.strptime(tstr, '%Y-%m-%d %H:%M:%S')
-                    # - Fallsback to the common 'YYYY-MM-DD HH:MM:SS' format if fromisoformat fails.
-                except Exception:
-                    messagebox.showerror('Error', 'Unrecognized timestamp format. Use ISO or YYYY-MM-DD HH:MM:SS')
-                    # - If parsing fails, notify the user with an error dialog explaining accepted formats.
-                    return  # Abort insertion since the timestamp was provided but unparseable.
+            ts = parse_timestamp_column([tstr])[0].item()
+            # - Uses the same parser as file loading: common fixed-width layouts are parsed without raising
+            #   exceptions, anything else ISO-like falls back to fromisoformat/strptime. NaT comes back as None.
+            if ts is None:
+                messagebox.showerror('Error', 'Unrecognized timestamp format. Use ISO or YYYY-MM-DD HH:MM:SS')
+                # - If parsing fails, notify the user with an error dialog explaining accepted formats.
+                return  # Abort insertion since the timestamp was provided but unparseable.
 
         try:
             temp = float(self.temp_var.get())
@@ -484,15 +635,95 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
         self.app.inserted_rows.append(row)
         # - Appends the row to the shared list on the app instance so other tabs (ProcessTab/GraphTab) can access it.
 
-        display_tuple = (ts.isoformat(sep=' '), gh, temp, hum, light)
-        # - Builds a human-readable tuple for the listbox; isoformat with space produces 'YYYY-MM-DD HH:MM:SS' like text.
+        self.app.inserted_summary.add_row(row)  # Keeps the running statistics in step with inserted_rows.
+
+        flags = self.app.detector.update(row)  # O(1) anomaly checks against this greenhouse's recent readings.
+        if flags:
+            self.app.inserted_flags[len(self.app.inserted_rows) - 1] = flags
 
-        self.listbox.insert('end', str(display_tuple))
-        # - Inserts the string representation of the tuple into the listbox at the end so the newest item shows last.
+        store = self._target_store()
+        if store is not None:
+            report = store.append_row(row)  # Persists the reading; an append to the greenhouse's segment file.
+            if report['conflicting']:
+                messagebox.showwarning('Not stored', format_store_report(report))
 
-        messagebox.showinfo('Inserted', 'Row inserted successfully.')
+        self.row_list.scroll_to_end()
+        # - Scrolls the list to the bottom so the newest row shows last; only the visible lines are re-rendered.
+
+        if flags:
+            messagebox.showwarning('Inserted', f'Row inserted, but it looks anomalous: {describe_anomalies(flags)}.')
+        else:
+            messagebox.showinfo('Inserted', 'Row inserted successfully.')
         # - Gives the user confirmation that their action succeeded; useful feedback for beginners.
 
+    def open_bulk_insert(self):  # Opens a window for pasting (or loading) many readings and inserting them at once.
+        win = tk.Toplevel(self)
+        win.title('Bulk Insert')
+
+        ttk.Label(win, text='Paste CSV or tab-separated rows (timestamp, greenhouse, temperature, humidity, light), '
+                            'with or without a header:').pack(anchor='w', padx=10, pady=(10, 4))
+
+        text = tk.Text(win, height=15, width=90, wrap='none')
+        text.pack(fill='both', expand=True, padx=10)
+        # - wrap='none' keeps one reading per visual line so line numbers in the report match what the user sees.
+
+        report = tk.Text(win, height=6, width=90, state='disabled')
+        # - Every problem goes into this one report instead of a dialog per row.
+
+        def load_file():
+            fpath = filedialog.askopenfilename(parent=win, filetypes=[('CSV / TSV files', '*.csv *.tsv *.txt'), ('All files', '*.*')])
+            if not fpath:
+                return
+            with open(fpath, newline='') as fh:
+                text.delete('1.0', 'end')
+                text.insert('1.0', fh.read())
+
+        def insert():
+            columns, errors = parse_bulk_rows(text.get('1.0', 'end'), self.greenhouse_var.get().strip() or 'unknown')
+            before = len(self.app.inserted_flags)
+            inserted = self.insert_columns(columns)
+            flagged = len(self.app.inserted_flags) - before
+            report.config(state='normal')
+            report.delete('1.0', 'end')
+            report.insert('1.0', format_bulk_report(inserted, errors)
+                          + (f'\n{flagged} inserted rows look anomalous (highlighted in the list).' if flagged else ''))
+            report.config(state='disabled')
+            if inserted and not errors:
+                text.delete('1.0', 'end')  # Everything went in; clear the box ready for the next batch.
+
+        buttons = ttk.Frame(win)
+        buttons.pack(fill='x', padx=10, pady=6)
+        ttk.Button(buttons, text='Load File...', command=load_file).pack(side='left')
+        ttk.Button(buttons, text='Insert All', command=insert).pack(side='left', padx=8)
+        ttk.Button(buttons, text='Close', command=win.destroy).pack(side='right')
+        report.pack(fill='x', padx=10, pady=(0, 10))
+
+    def insert_columns(self, columns):  # Appends a whole column dict to inserted_rows in one go; returns rows added.
+        n = len(columns['timestamp'])
+        if not n:
+            return 0
+        first = len(self.app.inserted_rows)
+        self.app.inserted_rows.extend_columns(columns)  # One vectorised copy per column.
+        self.app.inserted_summary.add_columns(columns)  # Statistics updated from the arrays, not row by row.
+        flags = self.app.detector.update_columns(columns)
+        for i in np.flatnonzero(flags):
+            self.app.inserted_flags[first + int(i)] = int(flags[i])
+        store = self._target_store()
+        if store is not None:
+            report = store.append_columns(columns)  # One append (and at most one fsync) per greenhouse.
+            if report['conflicting']:
+                messagebox.showwarning('Not all stored', format_store_report(report))
+        self.row_list.scroll_to_end()  # A single redraw for the whole batch.
+        return n
+
+    def _target_store(self):  # The store inserted rows go to, or None when "Also write to store" is off.
+        if not self.write_store_var.get():
+            return None
+        store = self.app.open_store()
+        if store is None:
+            self.write_store_var.set(False)  # Reported once by open_store; don't repeat it for every row.
+        return store
+
     def clear_inputs(self):  # Resets the input StringVars in the form to empty strings.
         self.temp_var.set('')  # Clears temperature field so the form is ready for new input.
         self.hum_var.set('')  # Clears humidity field.
@@ -500,73 +731,44 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
         self.timestamp_var.set('')  # Clears timestamp field.
 
     def save_inserted(self):  # Saves inserted rows to a file with optional sorting specified by the user.
-        rows = list(self.app.inserted_rows)
-        # - Makes a shallow copy so we can sort without changing the original list ordering in-memory.
-        # - This avoids surprising side effects if other parts of the code expect original insertion order.
-
-        if not rows:
+        if not self.app.inserted_rows:
             messagebox.showwarning('No data', 'There is no inserted data to save.')
             return  # Nothing to save; inform user and abort.
 
-        option = self.sort_var.get()  # Reads the human-readable sort option chosen by the user.
-
-        if option == 'Lowest Humidity':
-            rows.sort(key=lambda r: (np.nan if np.isnan(r['humidity']) else r['humidity']))
-            # - Sorts ascending by humidity, but push NaNs to the front by converting NaN to np.nan (preserve NaN behavior).
-        elif option == 'Highest Humidity':
-            rows.sort(key=lambda r: (np.nan if np.isnan(r['humidity']) else -r['humidity']))
-            # - Sorts by negative humidity so largest humidity values come first; NaNs handled similarly.
-        elif option == 'Lowest Temperature':
-            rows.sort(key=lambda r: (np.nan if np.isnan(r['temperature']) else r['temperature']))
-            # - Sorst ascending by temperature.
-        elif option == 'Highest Temperature':
-            rows.sort(key=lambda r: (np.nan if np.isnan(r['temperature']) else -r['temperature']))
-            # - Sorts descending by temperature via negation.
-
-        fpath = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[('CSV files', '*.csv'), ('Text files', '*.txt')])
+        key, descending = self.SORT_KEYS[self.sort_var.get()]
+        # - Maps the human-readable sort option onto the column to sort by and the direction.
+
+        fpath = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=save_filetypes())
         # - Asks the user where to save the file and what name to give it.
         # - defaultextension ensures the saved file has .csv by default; user may override.
 
         if not fpath:
             return  # User cancelled the save dialog; do nothing.
 
-        base, ext = os.path.splitext(fpath)
-        # - Splits the returned path into base and extension so we can decide save format behavior.
-
-        ext = ext.lower()  # Normalize extension to lowercase for reliable comparisons like '.CSV' vs '.csv'.
-
-        if ext == '.csv':
-            with open(fpath, 'w', newline='') as f:
-                writer = csv.writer(f)  # Use csv.writer to produce proper CSV formatting (quoting, commas).
-                writer.writerow(['timestamp', 'greenhouse', 'temperature', 'humidity', 'light'])
-                # - Writes a canonical header row so the file is self-describing and can be re-loaded by our header-aware path.
-                for r in rows:
-                    ts = r['timestamp'].isoformat(sep=' ') if r['timestamp'] else ''
-                    # - Converts datetime to human-readable string if present; use empty string when missing.
+        try:
+            n = save_columns(fpath, self.app.inserted_rows.columns(), key, descending)
+        except ValueError as e:  # e.g. a .parquet name without pyarrow installed.
+            messagebox.showerror('Error', str(e))
+            return
+        # - .csv is comma separated with a canonical header row so the file can be re-loaded by the header-aware
+        #   reader; .tsv/.txt get tab separated values (.txt keeps the old header-less layout); .npz/.parquet store
+        #   the binary columns, which load back many times faster.
+        # - Sorting is one stable argsort (NaN readings last in either direction) and rows are written in large
+        #   chunks. Nothing is copied out of inserted_rows.
 
-                    writer.writerow([ts, r['greenhouse'], r['temperature'], r['humidity'], r['light']])
-                    # - Writes each row in the canonical column order to keep output consistent and easy to parse later.
-        else:
-            # If user picked a non-CSV extension (e.g., .txt) write a tab-separated file that's still human readable.
-            with open(fpath, 'w') as f:
-                for r in rows:
-                    ts = r['timestamp'].isoformat(sep=' ') if r['timestamp'] else ''
-                    f.write("{}\t{}\t{}\t{}\t{}\n".format(ts, r['greenhouse'], r['temperature'], r['humidity'], r['light']))
-                    # - Use \t to separate fields; this is simple and often opened correctly by text editors and spreadsheets.
-
-        messagebox.showinfo('Saved', f'Saved {len(rows)} rows to {fpath}')
+        messagebox.showinfo('Saved', f'Saved {n} rows to {fpath}')
         # - Informs how many rows were saved and where; good user feedback for verification.
 
-    def return_selected(self):  # Shows the selected listbox items in a new read-only window.
-        sel = self.listbox.curselection()
-        # - curselection returns a tuple of selected indices (may be empty when nothing selected).
+    def return_selected(self):  # Shows the selected rows in a new read-only window.
+        sel = self.row_list.selected_indices()
+        # - Indexes into app.inserted_rows (may be empty when nothing selected), including rows scrolled out of view.
 
         if not sel:
             messagebox.showwarning('Select', 'Please select at least one row.')
             return  # If nothing is selected, prompt the user to choose something.
 
-        values = [self.listbox.get(i) for i in sel]
-        # - Builds a list of the selected items by retrieving them from the listbox by index.
+        values = [format_row(self.app.inserted_rows[i]) for i in sel]
+        # - Builds the text from the underlying rows rather than from widget strings.
 
         win = tk.Toplevel(self)  # Creates a new top-level window to display the values to the user.
         win.title('Returned Values')  # Title for the new window so it's clear what it contains.
@@ -588,11 +790,16 @@ class InsertTab(tk.Frame):  # Frames responsible for manual data entry (insertin
             return  # Ask for confirmation; abort if the user says No.
 
         self.app.inserted_rows.clear()  # Clears the list in-place so other references to this list see the change immediately.
-        self.listbox.delete(0, 'end')  # Removes all entries from the visual listbox to reflect the cleared state.
+        self.app.inserted_summary = SensorSummary()  # Resets the running statistics along with the rows.
+        self.app.inserted_flags = {}  # The detector keeps its state: the sensors' recent history hasn't changed.
+        self.row_list.clear_selection()  # Drops the selection and redraws the (now empty) list.
         messagebox.showinfo('Cleared', 'All inserted rows have been cleared.')  # Notify the user the operation completed.
 
 
 # Process Tab
+LOAD_POLL_MS = 100  # How often (ms) the Tk main loop checks a background load for progress.
+
+
 class ProcessTab(tk.Frame):  # Frames for loading data files, processing rows, and displaying textual summaries.
     def __init__(self, parent, app: CowApp):
         super().__init__(parent)
@@ -601,16 +808,68 @@ class ProcessTab(tk.Frame):  # Frames for loading data files, processing rows, a
         top = ttk.Frame(self)  # Top area frame for action buttons like loading files.
         top.pack(fill='x', padx=10, pady=10)
 
-        ttk.Button(top, text='Load CSV File', command=self.load_file).pack(side='left')
+        self.load_file_button = ttk.Button(top, text='Load CSV File', command=self.load_file)
+        self.load_file_button.pack(side='left')
         # - Loads a single CSV file via file dialog and parse it using read_csv_file.
 
-        ttk.Button(top, text='Load Directory (all CSVs)', command=self.load_directory).pack(side='left', padx=6)
+        self.load_dir_button = ttk.Button(top, text='Load Directory (all CSVs)', command=self.load_directory)
+        self.load_dir_button.pack(side='left', padx=6)
         # - Loads all CSV files from a selected directory and combine them.
+        # - Both loads run on a background thread; the buttons are disabled while one is in progress.
 
         ttk.Button(top, text='Process Inserted Data', command=self.process_inserted).pack(side='left', padx=6)
         # - Processes the rows that were manually inserted into the InsertTab (app.inserted_rows).
 
-        self.loaded_rows = []  # Will hold rows loaded by load_file or load_directory for review/processing.
+        ttk.Checkbutton(top, text='Force re-parse (ignore cache)', variable=self.app.force_reparse).pack(side='left', padx=6)
+        # - Re-reads the CSV text even if a cached copy looks up to date.
+
+        ttk.Button(top, text='Clear Cache', command=self.clear_cache).pack(side='left', padx=6)
+        # - Deletes every cached parse from disk.
+
+        store_bar = ttk.Frame(self)  # Second row of buttons for the reading store.
+        store_bar.pack(fill='x', padx=10)
+
+        ttk.Button(store_bar, text='Import Directory into Store', command=self.import_directory).pack(side='left')
+        # - Parses a directory of CSVs and appends the readings to the store (already stored readings are skipped).
+
+        ttk.Button(store_bar, text='Load from Store', command=self.load_store).pack(side='left', padx=6)
+        # - Uses the store as the data source instead of CSV files.
+
+        self.follow_button = ttk.Button(store_bar, text='Follow Directory', command=self.toggle_follow)
+        self.follow_button.pack(side='left', padx=6)
+        # - Loads a directory and keeps appending whatever loggers add to its CSVs until stopped.
+
+        self._tail = None  # DirectoryTail being followed, None when not following.
+        self._tail_after = None  # after() id of the next poll.
+
+        self.range_bar = RangeBar(self)  # Start/end/greenhouse controls; summaries only cover the selected slice.
+        self.range_bar.pack(fill='x', padx=10, pady=(8, 0))
+        self.range_bar.last_day_button.configure(command=lambda: self.range_bar.set_last_day(self.loaded_rows))
+        ttk.Button(self.range_bar, text='Process Range', command=self.process_range).pack(side='left', padx=4)
+        # - Re-runs the summary over just the rows of loaded_rows inside the selected range.
+
+        group_bar = ttk.Frame(self)  # Per-greenhouse, per-time-bucket statistics.
+        group_bar.pack(fill='x', padx=10, pady=(8, 0))
+
+        ttk.Label(group_bar, text='Group by greenhouse and').pack(side='left')
+        self.bucket_var = tk.StringVar(value='Hour')
+        ttk.Combobox(group_bar, values=list(RESAMPLE_BUCKETS), textvariable=self.bucket_var, state='readonly',
+                     width=8).pack(side='left', padx=4)
+        ttk.Button(group_bar, text='Group', command=self.group_rows).pack(side='left', padx=4)
+        # - Groups loaded_rows (only the selected range when one is set) and shows the table below.
+
+        ttk.Button(group_bar, text='Export Groups', command=self.export_groups).pack(side='left', padx=4)
+        # - Saves every group of the last table, not just the ones shown, as CSV or TSV.
+
+        self.group_table = None  # The last group_by table, kept for export.
+
+        self.loader = LoadProgress(self)  # Progress of a background load, with a way to stop it.
+        self.loader.pack(fill='x', padx=10, pady=(8, 0))
+
+        self.performance = PerformancePanel(self)  # What each pipeline stage cost, when profiling is switched on.
+        self.performance.pack(fill='x', padx=10, pady=(8, 0))
+
+        self.loaded_rows = SensorFrame()  # Will hold rows loaded by load_file or load_directory for review/processing.
 
         mid = ttk.Frame(self)  # Middle area frame to display summary output text.
         mid.pack(fill='both', expand=True, padx=10, pady=10)
@@ -626,53 +885,286 @@ class ProcessTab(tk.Frame):  # Frames for loading data files, processing rows, a
         ttk.Button(bottom, text='Save Summary to File', command=self.save_summary).pack(side='left')
         # - Saves the content of the text widget to a .txt file via a save dialog.
 
+        ttk.Button(bottom, text='Export Loaded Rows', command=self.export_rows).pack(side='left', padx=6)
+        # - Saves loaded_rows as CSV/TSV or, much faster to write and re-load, as .npz/.parquet columns.
+
     def load_file(self):  # Prompts the user to select one CSV file and load it.
-        f = filedialog.askopenfilename(filetypes=[('CSV files', '*.csv'), ('All files', '*.*')])
+        f = filedialog.askopenfilename(filetypes=OPEN_FILETYPES)
         if not f:
             return  # User cancelled file selection.
 
-        rows = read_csv_file(f)  # Parses the selected CSV; returns a list of normalized row dicts.
-        self.loaded_rows = rows  # Save parsed rows locally for processing/display.
-        messagebox.showinfo('Loaded', f'Loaded {len(rows)} rows from {f}')  # Notify how many rows were loaded.
-        self.process_rows(self.loaded_rows)  # Automatically run processing to show immediate feedback.
+        cache, refresh = self.app.csv_cache, self.app.force_reparse.get()  # Tk variables are only read on the main thread.
+
+        def job(progress, cancel):
+            return load_csv_file_cached(f, cache, refresh=refresh, progress=progress, cancel=cancel)
+            # - Parses the selected CSV into columns, or maps them straight from the cache when the file hasn't changed.
+
+        def done(result):
+            columns, summary, hit = result
+            rows = SensorFrame.from_columns(columns, copy=False)  # Columnar rows for display/processing.
+            self.stop_follow()  # loaded_rows is replaced, so there is nothing left to append to.
+            self.loaded_rows = rows  # Save parsed rows locally for processing/display.
+            source = ' (cached)' if hit else ''
+            messagebox.showinfo('Loaded', f'Loaded {len(rows)} rows from {f}{source}')  # Notify how many rows were loaded.
+            self.process_rows(self.loaded_rows, summary)
+            # - Stats come with the load (computed from the NumPy columns, or stored in the cache entry).
+
+        self.run_in_background(job, done)
 
     def load_directory(self):  # Prompts the user to select a directory and load all CSV files within it.
         d = filedialog.askdirectory()
         if not d:
             return  # User cancelled directory selection.
 
-        rows = read_all_csv_in_dir(d)  # Reads all CSVs found in the directory and combine rows.
-        self.loaded_rows = rows
-        messagebox.showinfo('Loaded', f'Loaded {len(rows)} rows from CSVs in {d}')
-        self.process_rows(self.loaded_rows)  # Show summaries of the combined dataset.
+        cache, refresh = self.app.csv_cache, self.app.force_reparse.get()
+
+        def job(progress, cancel):
+            return load_csv_dir_cached(d, cache, refresh=refresh, progress=progress, cancel=cancel)
+            # - Reads all CSVs found in the directory (in parallel for big directories), or maps the cached parse.
+
+        def done(result):
+            columns, report = result
+            rows = SensorFrame.from_columns(columns, copy=False)
+            self.stop_follow()
+            self.loaded_rows = rows
+            if report['failed']:
+                messagebox.showwarning('Loaded with errors', format_load_report(report))
+                # - One dialog listing every file that failed, rather than messages printed to a console the user can't see.
+            else:
+                source = ' (cached)' if report['cached'] else ''
+                messagebox.showinfo('Loaded', f'Loaded {len(rows)} rows from CSVs in {d}{source}')
+            self.process_rows(self.loaded_rows, report['summary'])
+            # - The summary was merged from per-file partial stats during loading, so no second pass is needed.
 
-    def process_rows(self, rows):  # Computes summaries and display results in the text widget.
+        self.run_in_background(job, done)
+
+    def run_in_background(self, job, on_done):  # Runs job(progress, cancel) in the background via self.loader.
+        self.loader.run(job, on_done, (self.load_file_button, self.load_dir_button))
+
+    def import_directory(self):  # Appends every reading in a directory of CSVs to the reading store.
+        d = filedialog.askdirectory()
+        if not d:
+            return
+        store = self.app.open_store()
+        if store is None:
+            return
+        cache, refresh, detector = self.app.csv_cache, self.app.force_reparse.get(), self.app.detector
+
+        def job(progress, cancel):
+            columns, report = load_csv_dir_cached(d, cache, refresh=refresh, progress=progress, cancel=cancel)
+            if cancel.is_set():
+                raise LoadCancelled()  # Last chance to stop: once appending starts the readings go in.
+            stored = store.append_columns(columns)
+            store.flush()  # An import is a natural checkpoint, so it is always made durable.
+            flagged = int(np.count_nonzero(detector.update_columns(columns)))
+            # - Imported readings feed the same streaming detector as inserted rows.
+            # - The store and the detector lock themselves, so rows inserted meanwhile on the Tk thread are safe.
+            return stored, flagged, report
+
+        def done(result):
+            stored, flagged, report = result
+            show = messagebox.showwarning if stored['conflicting'] else messagebox.showinfo
+            show('Imported', f'{format_store_report(stored)}\n{flagged} flagged as anomalous.\n{format_load_report(report)}')
+
+        self.run_in_background(job, done)
+
+    def load_store(self):  # Loads every reading in the store for processing.
+        store = self.app.open_store()
+        if store is None:
+            return
+        columns = store.load_columns()
+        self.stop_follow()
+        self.loaded_rows = SensorFrame.from_columns(columns, copy=False)
+        self.process_rows(self.loaded_rows, SensorSummary().add_columns(columns))
+
+    def toggle_follow(self):  # Starts following a directory of growing CSVs, or stops if already following.
+        if self._tail is not None:
+            self.stop_follow()
+            return
+        d = filedialog.askdirectory()
+        if not d:
+            return
+        tail = DirectoryTail(d)
+
+        def job(progress, cancel):
+            return tail.poll()  # The first poll reads everything already in the files, so it runs off the Tk thread.
+
+        def done(columns):
+            self._tail = tail
+            self._tail_dir = d
+            self.loaded_rows = SensorFrame()
+            self._tail_summary = SensorSummary()  # Updated with each batch instead of recomputed over every row.
+            self._tail_detector = AnomalyDetector()  # Streaming, so each batch continues where the last one ended.
+            self._tail_flags = np.empty(0, dtype=np.uint16)
+            self.follow_button.configure(text='Stop Following')
+            self._apply_tail(columns)
+            self._tail_after = self.after(TAIL_POLL_MS, self._tail_tick)
+
+        self.run_in_background(job, done)
+
+    def is_following(self):
+        return self._tail is not None
+
+    def stop_follow(self):
+        if self._tail is None:
+            return
+        if self._tail_after is not None:
+            self.after_cancel(self._tail_after)
+        self._tail = self._tail_after = None
+        self.follow_button.configure(text='Follow Directory')
+        self.loader.label.configure(text=f'Stopped following ({len(self.loaded_rows):,} rows)')
+
+    def _tail_tick(self):  # One poll of the followed directory (scheduled with after()).
+        # - A poll where nothing changed is one os.stat() per file, so this stays on the Tk thread; new lines are
+        #   only the bytes a logger appended in the last second.
+        try:
+            columns = self._tail.poll()
+        except OSError as e:
+            self.stop_follow()
+            messagebox.showerror('Error', f'Following stopped: {e}')
+            return
+        self._apply_tail(columns)
+        self._tail_after = self.after(TAIL_POLL_MS, self._tail_tick)
+
+    def _apply_tail(self, columns):  # Appends a polled batch to loaded_rows and refreshes summaries and live graphs.
+        if columns is not None and len(columns['timestamp']):
+            self.loaded_rows.extend_columns(columns)
+            self._tail_summary.add_columns(columns)
+            self._tail_flags = np.concatenate([self._tail_flags, self._tail_detector.update_columns(columns)])
+            self.process_rows(self.loaded_rows, self._tail_summary, self._tail_flags)
+            self.app.graph_tab.on_rows_appended(self.loaded_rows, self._tail_flags)
+        restarts = self._tail.restarts()
+        note = f', {restarts} truncated/rotated' if restarts else ''
+        self.loader.label.configure(text=f'Following {self._tail_dir}: {len(self._tail.tails)} files, '
+                                           f'{len(self.loaded_rows):,} rows{note}')
+
+    def process_rows(self, rows, summary=None, flags=None):  # Computes summaries and display results in the text widget.
+        # - summary: an optional SensorSummary that is already up to date for rows; computed from rows when omitted.
+        # - flags: optional anomaly flags aligned with rows; a fresh AnomalyDetector pass over rows when omitted.
         if not rows:
             messagebox.showwarning('No data', 'No data to process.')
             return  # Nothing to process; inform the user.
 
-        summaries = compute_summaries(rows)  # Computes numeric summaries for canonical sensor fields.
+        with PROFILER.stage('display', rows=len(rows)):
+            summaries = self._show_summary(rows, summary, flags)
+        self.performance.refresh()  # Loads and processing are the stages most worth watching.
+        return summaries  # Returns the computed summaries so other code or tests can use them programmatically.
+
+    def _show_summary(self, rows, summary, flags):  # Fills the text widget for process_rows; returns the summaries.
+        if summary is None:
+            summary = SensorSummary().add_rows(rows)
+        summaries = summary.as_dict()  # Numeric summaries for canonical sensor fields.
 
         out_lines = []  # Builds a list of strings we will insert into the text widget.
         out_lines.append(f'Rows processed: {len(rows)}')  # First line indicates the dataset size.
 
         for field, s in summaries.items():  # Format each field's summary into a readable line.
-            out_lines.append(f"{field.title()}: count={s['count']}, mean={s['mean']:.3f}, std={s['std']:.3f}, min={s['min']}, max={s['max']}")
+            quantiles = ', '.join(f'{name}={s[name]:.3f}' for name, _q in SUMMARY_QUANTILES)
+            out_lines.append(f"{field.title()}: count={s['count']}, mean={s['mean']:.3f}, std={s['std']:.3f}, min={s['min']}, max={s['max']}, {quantiles}")
             # - field.title() makes 'temperature', 'Temperature' for nicer display.
             # - Numeric stats are formatted with a few decimal places for readability; min/max are printed as-is.
+            # - The median and percentiles are estimates from bounded-memory sketches (see QuantileSketch).
+
+        per_greenhouse = summary.greenhouse_quantiles()
+        if len(per_greenhouse) > 1:
+            names = ' / '.join(name for name, _q in SUMMARY_QUANTILES)
+            out_lines.append(f'\nPer greenhouse ({names}, first 20):')
+            for greenhouse, fields in list(per_greenhouse.items())[:20]:
+                parts = [f"{field.title()} " + ' / '.join(f'{q[name]:.2f}' for name, _q in SUMMARY_QUANTILES)
+                         for field, q in fields.items()]
+                out_lines.append(f"  {greenhouse}: {', '.join(parts)}")
+
+        if flags is None:
+            flags = AnomalyDetector().update_columns(rows.columns())  # Vectorised, one pass per greenhouse and field.
+        flagged = np.flatnonzero(flags)
+        out_lines.append(f'\nAnomalies: {len(flagged)} rows flagged')
+        for field in SENSOR_FIELDS:
+            counts = [f'{kind}={int(np.count_nonzero(flags & anomaly_bit(field, kind)))}' for kind in ANOMALY_KINDS]
+            out_lines.append(f"  {field.title()}: {', '.join(counts)}")
+        if len(flagged):
+            out_lines.append('Flagged rows (first 15):')
+            for i in flagged[:15]:
+                out_lines.append(f'  !! {rows[int(i)]}  <- {describe_anomalies(flags[i])}')
+                # - Marked with '!!' and the reason so they stand out from the sample rows below.
 
         out_lines.append('\nSample rows (first 15):')  # Adds a header before sample rows to show example data structure.
 
-        for r in rows[:15]:  # Adds up to the first 5 rows; helpful to spot-check the parsed structure and values.
-            out_lines.append(str(r))  # Convert the dict to a string and append so the user can visually inspect a few records.
+        for i, r in enumerate(rows[:15]):  # Adds up to the first 15 rows; helpful to spot-check the parsed structure and values.
+            out_lines.append(('!! ' if flags[i] else '') + str(r))
+            # - Converts the row to a string so the user can visually inspect a few records; flagged ones are marked.
 
         self.text.delete('1.0', 'end')  # Clears existing content in the summary Text widget.
         self.text.insert('end', '\n'.join(out_lines))  # Insert our assembled lines joined with newline characters.
-        return summaries  # Returns the computed summaries so other code or tests can use them programmatically.
+        self.text.tag_configure('anomaly', background=VirtualRowList.HIGHLIGHT)
+        start = '1.0'
+        while True:  # Highlights every flagged line (the ones starting with '!!').
+            start = self.text.search('!!', start, stopindex='end')
+            if not start:
+                break
+            self.text.tag_add('anomaly', start, f'{start} lineend')
+            start = f'{start} lineend'
+        return summaries
+
+    def process_range(self):  # Summarises only the rows of loaded_rows inside the selected time range.
+        if not self.loaded_rows:
+            messagebox.showwarning('No data', 'Load a file, directory or the store first.')
+            return
+        rows = self.range_bar.apply(self.loaded_rows)  # O(log n) lookup through the cached TimeIndex.
+        if rows is not None:
+            self.process_rows(rows)
+
+    def group_rows(self):  # Shows per-greenhouse, per-bucket statistics of loaded_rows (or its selected range).
+        if not self.loaded_rows:
+            messagebox.showwarning('No data', 'Load a file, directory or the store first.')
+            return
+        rows = self.range_bar.apply(self.loaded_rows) if self.range_bar.is_active() else self.loaded_rows
+        if rows is None:
+            return
+        self.group_table = group_by(rows.columns(), self.bucket_var.get())
+        self.text.delete('1.0', 'end')
+        self.text.insert('end', format_group_table(self.group_table))
+        # - Only the first groups are shown in the text widget; exporting writes them all.
+        self.performance.refresh()
+
+    def export_groups(self):  # Saves the last group table as CSV (or tab separated for .tsv/.txt).
+        if self.group_table is None:
+            messagebox.showwarning('No groups', 'Group the loaded data first.')
+            return
+        f = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[('CSV File', '*.csv'), ('TSV File', '*.tsv'),
+                                                                             ('Text File', '*.txt')])
+        if not f:
+            return
+        save_group_table(f, self.group_table, ',' if f.lower().endswith('.csv') else '\t')
+        messagebox.showinfo('Saved', f'{len(self.group_table["greenhouse"])} groups saved to {f}')
 
     def process_inserted(self):  # Convenience to run processing on rows manually inserted in the InsertTab.
-        rows = list(self.app.inserted_rows)  # Copies current inserted rows and pass to process_rows.
-        self.process_rows(rows)
+        rows = self.app.inserted_rows.copy()  # Copies current inserted rows and pass to process_rows.
+        flags = np.zeros(len(rows), dtype=np.uint16)
+        for i, mask in self.app.inserted_flags.items():
+            flags[i] = mask  # Flags from the live detector, as shown when each row was inserted.
+        self.process_rows(rows, self.app.inserted_summary, flags)  # The running stats are already current, no rescan needed.
+
+    def clear_cache(self):  # Removes all cached CSV parses after confirmation.
+        size_mb = self.app.csv_cache.total_bytes() / 1e6
+        if not messagebox.askyesno('Confirm', f'Delete the parse cache ({size_mb:.1f} MB)?'):
+            return
+        self.app.csv_cache.clear()
+        messagebox.showinfo('Cleared', 'The parse cache has been cleared.')
+
+    def export_rows(self):  # Saves every row of loaded_rows in the format picked in the save dialog.
+        if not self.loaded_rows:
+            messagebox.showwarning('No data', 'Load a file, directory or the store first.')
+            return
+        f = filedialog.asksaveasfilename(defaultextension='.npz', filetypes=save_filetypes())
+        if not f:
+            return
+        columns = self.loaded_rows.columns()
+        try:
+            n = save_columns(f, columns, summary=SensorSummary().add_columns(columns))
+        except (OSError, ValueError) as e:
+            messagebox.showerror('Error', f'Export failed: {e}')
+            return
+        messagebox.showinfo('Saved', f'Saved {n} rows to {f}')
 
     def save_summary(self):  # Saves the current content of the summary Text widget to a .txt or .csv file based off your choice.
         content = self.text.get('1.0', 'end').strip()  # Read the entire contents and strip trailing whitespace/newlines.
@@ -689,33 +1181,144 @@ class ProcessTab(tk.Frame):  # Frames for loading data files, processing rows, a
         messagebox.showinfo('Saved', f'Summary saved to {f}')  # Confirm success to the user.
 
 
+# Plot windows
+class PlotWindow:  # A graph window that is kept and updated in place instead of being rebuilt on every click.
+    """
+    One Toplevel with an embedded figure, owned by GraphTab: one per graph
+    key for separate windows, one per selection for the combined window.
+
+    show() draws the graphs the first time; afterwards it points the
+    existing artists at the new data (greenhouse.update_graph). When the
+    view limits and legends stayed the same, only the data artists are
+    redrawn onto a saved copy of the rest of the figure (blitting), which
+    takes milliseconds; otherwise the figure is redrawn once. The data
+    artists are animated, so full draws leave them out of the saved
+    background and _on_draw paints them back on top. Closing the window
+    destroys the canvas and releases the figure.
+
+    The Matplotlib toolbar under the figure zooms and pans. Each of its
+    steps changes the limits, which makes the decimated lines pick their
+    points again for the visible range (DecimatedLine.update), and ends
+    in a full draw, so _on_draw saves the new background as usual. Live
+    updates leave an axes alone while its limits differ from the ones
+    show() last set, and go back to widening it once the toolbar's Home
+    button restores them.
+    """
+
+    def __init__(self, tab, ident, title, keys, figsize):
+        self.tab = tab
+        self.ident = ident  # Key of this window in tab.plot_windows.
+        self.live = False  # True when it follows the Process tab's live data.
+        self.win = tk.Toplevel(tab)
+        self.win.title(title)
+        self.win.protocol('WM_DELETE_WINDOW', self.close)
+        from matplotlib.figure import Figure  # Imported on the first plot rather than at startup (see the imports above).
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        # - FigureCanvasTkAgg embeds the figure in the Toplevel; NavigationToolbar2Tk adds zoom, pan and Home buttons.
+        self.fig = Figure(figsize=figsize)
+        # - A bare Figure, not pyplot's: pyplot keeps every figure it makes in a global registry until closed.
+        axes = self.fig.subplots(nrows=len(keys), ncols=1, squeeze=False)[:, 0]  # Stacked vertically, one per graph.
+        self.graphs = [[ax, key, None] for ax, key in zip(axes, keys)]  # [axes, graph key, draw_graph handle].
+        self._views = [None] * len(self.graphs)  # (xlim, ylim) show() last left each axes at.
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.win)
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.win, pack_toolbar=False)
+        self.toolbar.pack(side='bottom', fill='x')  # Packed first so a small window shrinks the figure, not the toolbar.
+        self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self._background = None  # The figure without its data artists, saved after each full draw.
+
+    def is_open(self):
+        return self.win is not None
+
+    def close(self):  # Destroys the window and lets the figure and its data be freed.
+        self.tab.plot_windows.pop(self.ident, None)
+        self.win.destroy()
+        self.win = None
+        self.fig.clear()
+        self.graphs = []
+        self._background = None
+
+    def show(self, prepared, settings, grow_only=False):  # Draws or updates every graph with new prepared data.
+        # - settings: GraphTab._settings(). grow_only: see fit_view; live updates only ever widen the view.
+        first = self._background is None
+        full = first
+        zoomed = [grow_only and view is not None and _axes_view(ax) != view
+                  for (ax, _key, _handle), view in zip(self.graphs, self._views)]
+        # - An axes whose limits moved since the last show() was zoomed or panned with the toolbar; live updates
+        #   keep that view instead of widening it.
+        for i, (graph, keep_view) in enumerate(zip(self.graphs, zoomed)):
+            ax, key, handle = graph
+            changed = None if handle is None else update_graph(ax, handle, prepared, *settings, grow_only=grow_only,
+                                                               keep_view=keep_view)
+            if changed is None:  # First draw, or a change update_graph can't apply in place (this resets a zoom).
+                ax.clear()
+                graph[2] = draw_graph(ax, key, prepared, *settings)
+                for artist in graph_artists(graph[2]):
+                    artist.set_animated(True)
+                changed = True
+                keep_view = zoomed[i] = False
+            if not keep_view:
+                self._views[i] = _axes_view(ax)
+            full = full or changed
+        if full and not any(zoomed):
+            self.toolbar.update()  # Forgets the old zoom history, so Home returns to the view fitted just now.
+        with PROFILER.stage('render', rows=len(prepared['x']) * len(self.graphs)):
+            if first:
+                self.fig.tight_layout()
+            if full:
+                self.canvas.draw()  # _on_draw saves the new background and paints the data on top.
+            else:
+                self.canvas.restore_region(self._background)
+                self._draw_data()
+                self.canvas.blit(self.fig.bbox)
+
+    def _draw_data(self):  # Paints every data artist onto the canvas buffer.
+        for ax, _key, handle in self.graphs:
+            if handle is not None:  # None while a graph is still being drawn for the first time.
+                for artist in graph_artists(handle):
+                    ax.draw_artist(artist)
+
+    def _on_draw(self, _event):  # Runs after every full draw, including the ones a window resize triggers.
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_data()  # Before Tk copies the buffer to the screen, so the data appears in the same frame.
+
+
+def _axes_view(ax):  # The (xlim, ylim) an axes shows, to notice when the toolbar changed it.
+    return tuple(ax.get_xlim()), tuple(ax.get_ylim())
+
+
 # Graph Tab
 class GraphTab(tk.Frame):  # Frames that offers graph selection and drawing capabilities embedded in Tk windows.
     def __init__(self, parent, app: CowApp):
         super().__init__(parent)
         self.app = app  # Saves the app reference so we can use inserted rows as a data source if requested.
 
-        self.graph_options = [
-            ('Temperature Time Series', 'temp_ts'),
-            ('Humidity Time Series', 'hum_ts'),
-            ('Light Time Series', 'light_ts'),
-            ('Temperature Histogram', 'temp_hist'),
-            ('Humidity Histogram', 'hum_hist'),
-            ('Temperature vs Humidity (scatter)', 'temp_hum_scatter')
-        ]
-        # - Graph options are tuples of (label shown to user, internal key used by drawing functions).
-        # - This pattern makes it easy to display a friendly name while mapping to program logic.
+        self.graph_options = GRAPH_OPTIONS  # (label shown to user, internal key used by draw_graph) pairs.
 
         top = ttk.Frame(self)  # Top area for load/use-inserted buttons.
         top.pack(fill='x', padx=10, pady=8)
 
-        ttk.Button(top, text='Load CSV File', command=self.load_file).pack(side='left')
-        # - Button to load CSV and set it as source for plotting.
+        self.load_file_button = ttk.Button(top, text='Load CSV File', command=self.load_file)
+        self.load_file_button.pack(side='left')
+        # - Button to load CSV and set it as source for plotting; the file is read on a background thread.
 
         ttk.Button(top, text='Use Inserted Data', command=self.use_inserted).pack(side='left', padx=6)
         # - Button to use the rows manually inserted via the InsertTab.
 
-        self.data_rows = []  # Local storage for the dataset to be plotted; can come from load_file or use_inserted.
+        ttk.Button(top, text='Load from Store', command=self.load_store).pack(side='left', padx=6)
+        # - Plots readings from the durable reading store.
+
+        ttk.Checkbutton(top, text='Force re-parse (ignore cache)', variable=self.app.force_reparse).pack(side='left', padx=6)
+        # - Same shared setting as on the Process tab.
+
+        self.loader = LoadProgress(self)  # Progress of a file being loaded for plotting, with a way to stop it.
+        self.loader.pack(fill='x', padx=10, pady=(0, 8))
+
+        self.range_bar = RangeBar(self)  # Plots only cover the rows inside the selected time range.
+        self.range_bar.pack(fill='x', padx=10, pady=(0, 8))
+        self.range_bar.last_day_button.configure(command=lambda: self.range_bar.set_last_day(self.data_rows))
+
+        self.data_rows = SensorFrame()  # Local storage for the dataset to be plotted; can come from load_file or use_inserted.
 
         cb_frame = ttk.Frame(self)  # Frame to hold checkboxes for selecting which graphs to generate.
         cb_frame.pack(fill='x', padx=10)
@@ -737,49 +1340,98 @@ class GraphTab(tk.Frame):  # Frames that offers graph selection and drawing capa
         ttk.Button(btn_frame, text='Generate All in One Window', command=self.generate_combined).pack(side='left', padx=8)
         # - Creates a single Toplevel window with subplots stacked vertically for each selected graph.
 
+        ttk.Label(btn_frame, text='Time series decimation:').pack(side='left', padx=(16, 4))
+        self.decimate_var = tk.StringVar(value=DECIMATE_MODES[0])
+        ttk.Combobox(btn_frame, values=DECIMATE_MODES, textvariable=self.decimate_var, state='readonly', width=9).pack(side='left')
+        # - LTTB keeps the visual shape, Min/Max keeps every peak and dip, Off plots every point (slow for big data).
+
+        rolling_frame = ttk.Frame(self)  # Rolling-window overlays for the time series graphs.
+        rolling_frame.pack(fill='x', padx=10, pady=(0, 8))
+
+        ttk.Label(rolling_frame, text='Rolling window:').pack(side='left')
+        self.rolling_var = tk.StringVar(value='Off')
+        ttk.Combobox(rolling_frame, values=list(ROLLING_WINDOWS), textvariable=self.rolling_var, state='readonly',
+                     width=8).pack(side='left', padx=4)
+        self.overlay_var = tk.StringVar(value=ROLLING_OVERLAYS[1])
+        ttk.Combobox(rolling_frame, values=ROLLING_OVERLAYS, textvariable=self.overlay_var, state='readonly',
+                     width=11).pack(side='left', padx=4)
+        # - Draws the moving average (and a std or min/max band) over each time series; needs timestamps.
+
+        self.anomaly_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(rolling_frame, text='Mark anomalies', variable=self.anomaly_var).pack(side='left', padx=(16, 0))
+        # - Marks readings the anomaly detector flags (outliers, flatlines, jumps) in red on the time series.
+
+        self.follow_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(rolling_frame, text='Follow live data', variable=self.follow_var).pack(side='left', padx=(16, 0))
+        # - Graphs generated while this is ticked redraw whenever the Process tab's followed directory grows.
+
+        ttk.Label(rolling_frame, text='Scatter as density above').pack(side='left', padx=(16, 4))
+        self.density_var = tk.StringVar(value=str(DENSITY_THRESHOLD))
+        ttk.Spinbox(rolling_frame, from_=0, to=10 ** 9, increment=10_000, textvariable=self.density_var,
+                    width=10).pack(side='left')
+        ttk.Label(rolling_frame, text='points').pack(side='left', padx=(4, 0))
+        # - Past this many readings the scatter plot becomes a heatmap of readings per cell, which draws in the same
+        #   time however many readings there are.
+
+        self.plot_windows = {}  # Graph key (separate windows) or tuple of keys (combined window) -> its PlotWindow.
+        # - Generating a graph that already has an open window updates that window instead of opening another.
+
     def load_file(self):  # Use a file dialog to pick a CSV and parse it for plotting.
-        f = filedialog.askopenfilename(filetypes=[('CSV files', '*.csv'), ('All files', '*.*')])
+        f = filedialog.askopenfilename(filetypes=OPEN_FILETYPES)
         if not f:
             return  # If user cancels, do nothing.
 
-        self.data_rows = read_csv_file(f)  # Parse the CSV and set data_rows to the returned normalized row dicts.
-        messagebox.showinfo('Loaded', f'Loaded {len(self.data_rows)} rows from {f}')
-        # - Notify user how many rows will be available for plotting.
+        cache, refresh = self.app.csv_cache, self.app.force_reparse.get()
+
+        def job(progress, cancel):
+            return load_csv_file_cached(f, cache, refresh=refresh, progress=progress, cancel=cancel)
+
+        def done(result):
+            self.data_rows = SensorFrame.from_columns(result[0], copy=False)  # Parsed (or cached) columns as a SensorFrame.
+            messagebox.showinfo('Loaded', f'Loaded {len(self.data_rows)} rows from {f}')
+            # - Notify user how many rows will be available for plotting.
+
+        self.loader.run(job, done, (self.load_file_button,))
+
+    def load_store(self):  # Use every reading in the reading store as the plotting dataset.
+        store = self.app.open_store()
+        if store is None:
+            return
+        self.data_rows = SensorFrame.from_columns(store.load_columns(), copy=False)
+        messagebox.showinfo('Loaded', f'Loaded {len(self.data_rows)} rows from the store')
 
     def use_inserted(self):  # Use rows that were manually inserted via the InsertTab as the plotting dataset.
-        self.data_rows = list(self.app.inserted_rows)  # Copy the inserted rows into local storage.
+        self.data_rows = self.app.inserted_rows.copy()  # Copy the inserted rows into local storage.
         messagebox.showinfo('Using Inserted', f'{len(self.data_rows)} inserted rows will be used for graphs')
         # - Inform the user how many rows will be used for graph generation.
 
-    def _prepare_for_plot(self):  # Internal helper that turns normalized rows into x values and NumPy arrays for plotting.
+    def _prepare_for_plot(self, quiet=False, flags=None):  # Internal helper that turns normalized rows into x values and NumPy arrays for plotting.
+        # - quiet=True skips the "no data" warnings, for redraws nobody asked for explicitly.
+        # - flags: anomaly flags already known for every row of data_rows; otherwise they are computed here.
         if not self.data_rows:
-            messagebox.showwarning('No data', 'No data to plot.')
+            if not quiet:
+                messagebox.showwarning('No data', 'No data to plot.')
             return None  # Return None to signal no plotting should proceed.
 
-        times, temps, hums, lights = rows_to_numpy(self.data_rows)
-        # - Convert rows to a list of times and three numeric arrays for plotting convenience.
-
-        if any(t is not None for t in times):  # If at least one timestamp exists, we prefer a date-based x-axis.
-            try:
-                import matplotlib.dates as mdates  # Import locally since date utilities are only needed when timestamps exist.
-                xvals = [mdates.date2num(t) if t is not None else np.nan for t in times]
-                # - Convert datetime objects to Matplotlib's internal floating point representation for dates.
-                # - For missing timestamps we use np.nan to keep alignment with other arrays.
-
-                dates_used = True  # Flag to indicate the x-axis values represent dates and should be formatted accordingly.
-            except Exception:
-                # If import or conversion fails for any reason fall back to integer indices for the x-axis.
-                xvals = list(range(len(times)))
-                dates_used = False
+        selected = self.range_bar.select(self.data_rows)  # Restricts plotting to the selected time range (O(log n) lookup).
+        if selected is None:
+            return None  # A bad timestamp was entered; the error was already shown.
+        rows = self.data_rows if isinstance(selected, slice) else self.data_rows.take(selected)
+        if not rows:
+            if not quiet:
+                messagebox.showwarning('No data', 'No readings in the selected range.')
+            return None
+
+        if not self.anomaly_var.get():
+            flags = None
+        elif flags is not None:
+            flags = flags[selected]
         else:
-            # If No timestamps present in any row, use simple integer indices (row numbers) for the x-axis.
-            xvals = list(range(len(times)))
-            dates_used = False
-
-        # Return a dict of prepared data to keep drawing functions simple and avoid recomputing conversions.
-        return dict(x=xvals, dates_used=dates_used, times=times, temps=temps, hums=hums, lights=lights)
+            flags = AnomalyDetector().update_columns(rows.columns())
+        return prepare_plot_data(rows, flags)  # x values (dates when timestamps exist) and the sensor arrays.
 
-    def generate_separate(self):  # For each selected graph create a separate window with a single Matplotlib figure embedded.
+    def generate_separate(self):  # Shows each selected graph in its own window, reusing the window it already has.
+        live = self._follow_source()
         prepared = self._prepare_for_plot()
         if prepared is None:
             return  # If preparation failed, abort (a warning was already shown).
@@ -792,18 +1444,11 @@ class GraphTab(tk.Frame):  # Frames that offers graph selection and drawing capa
             return  # If Nothing is selected warn user and abort.
 
         for key in selected:
-            win = tk.Toplevel(self)  # Create a new top-level window for this plot so multiple can be open simultaneously.
-            win.title(key)  # Use the graph key as the window title so the user can identify it.
-            fig = plt.Figure(figsize=(6, 4))  # Create a Figure object sized for a single plot.
-            ax = fig.add_subplot(111)  # Add one Axes to the Figure to draw on.
+            self._show_window(key, key, [key], (6, 4), prepared, live)  # The graph key doubles as the window title.
+        self.app.process_tab.performance.refresh()  # Plot preparation and rendering show up next to the load stages.
 
-            self._draw_graph(ax, key, prepared)  # Draw the requested graph into the axes.
-
-            canvas = FigureCanvasTkAgg(fig, master=win)  # Embed the Matplotlib figure into the Tk window.
-            canvas.draw()  # Render the figure.
-            canvas.get_tk_widget().pack(fill='both', expand=True)  # Pack the canvas widget to fill the Toplevel window.
-
-    def generate_combined(self):  # Create one window with multiple vertically stacked subplots for all selected graphs.
+    def generate_combined(self):  # Shows all selected graphs stacked in one window (one window per selection).
+        live = self._follow_source()
         prepared = self._prepare_for_plot()
         if prepared is None:
             return
@@ -813,73 +1458,50 @@ class GraphTab(tk.Frame):  # Frames that offers graph selection and drawing capa
             messagebox.showwarning('No graphs', 'Select at least one graph.')
             return
 
-        win = tk.Toplevel(self)
-        win.title('Combined Graphs')  # Title communicates that multiple graphs will be present.
-
-        n = len(selected)  # Number of subplots required (one per selected graph).
-
-        fig, axes = plt.subplots(nrows=n, ncols=1, figsize=(7, 4 * n))
-        # - Create a figure with n rows and 1 column; figsize scales vertically with n.
-        if n == 1:
-            axes = [axes]  # When n==1 matplotlib returns a single Axes object; convert to list for uniform iteration.
-
-        for ax, key in zip(axes, selected):
-            self._draw_graph(ax, key, prepared)  # Draw each graph on its corresponding subplot.
-
-        canvas = FigureCanvasTkAgg(fig, master=win)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)  # Embed and pack the combined figure.
-
-    def _draw_graph(self, ax, key, prepared):  # Draw a specific graph type onto the provided Axes object.
-        x = prepared['x']  # x is either date-formatted numeric values (if dates_used True) or integer indices.
-
-        if key == 'temp_ts':
-            ax.plot(x, prepared['temps'], label='Temperature (C)')  # Plot temperature time series.
-            ax.set_ylabel('Temperature (C)')  # Label the y-axis to show units.
-            ax.legend()  # Show a legend identifying the plotted series.
-
-        elif key == 'hum_ts':
-            ax.plot(x, prepared['hums'], label='Humidity (%)')  # Plot humidity time series.
-            ax.set_ylabel('Humidity (%)')
-            ax.legend()
-
-        elif key == 'light_ts':
-            ax.plot(x, prepared['lights'], label='Light (lux)')  # Plot light time series in lux.
-            ax.set_ylabel('Light (lux)')
-            ax.legend()
-
-        elif key == 'temp_hist':
-            # Histogram requires removing NaNs because hist() fails with NaN values.
-            ax.hist(prepared['temps'][~np.isnan(prepared['temps'])], bins=20)
-            ax.set_xlabel('Temperature (C)')
-            ax.set_ylabel('Count')
-            ax.legend(["Temperature distribution"])
-
-        elif key == 'hum_hist':
-            ax.hist(prepared['hums'][~np.isnan(prepared['hums'])], bins=20)
-            ax.set_xlabel('Humidity (%)')
-            ax.set_ylabel('Count')
-            ax.legend(["Humidity distribution"])
-
-        elif key == 'temp_hum_scatter':
-            # Scatter plot uses temperature on x-axis and humidity on y-axis which helps visualise correlation.
-            ax.scatter(prepared['temps'], prepared['hums'])
-            ax.set_xlabel('Temperature (C)')
-            ax.set_ylabel('Humidity (%)')
-            ax.legend(["Temp vs Humidity"])
-
-        # If date values are used we need to format the x-axis to look like readable dates.
-        if prepared['dates_used']:
-            import matplotlib.dates as mdates  # Local import of date formatting tools used only when needed.
-            ax.xaxis_date()  # Tell Matplotlib to treat x-axis values as dates for tick placement.
-            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d %H:%M'))  # Format ticks as 'YYYY-MM-DD HH:MM'.
-            for label in ax.get_xticklabels():  # Rotate tick labels to avoid overlap and improve readability.
-                label.set_rotation(30)
-                label.set_ha('right')
-        else:
-            ax.set_xlabel('Index')  # If not using dates, labeling the x-axis as 'Index' clarifies what the horizontal axis represents.
+        self._show_window(tuple(selected), 'Combined Graphs', selected, (7, 4 * len(selected)), prepared, live)
+        # - The figure height scales with the number of graphs.
+        self.app.process_tab.performance.refresh()
+
+    def _show_window(self, ident, title, keys, figsize, prepared, live):  # Updates the window for ident, or opens it.
+        window = self.plot_windows.get(ident)
+        if window is None:
+            window = self.plot_windows[ident] = PlotWindow(self, ident, title, keys, figsize)
+        window.live = live
+        window.show(prepared, self._settings())
+        window.win.lift()  # Brings a reused window back to the front.
+
+    def _follow_source(self):  # True when new graphs should be live, switching data_rows to the followed rows if so.
+        process_tab = self.app.process_tab
+        if not (self.follow_var.get() and process_tab.is_following()):
+            return False
+        self.data_rows = process_tab.loaded_rows
+        return True
+
+    def on_rows_appended(self, frame, flags):  # Called by the Process tab after each batch of followed rows.
+        # - flags are the Process tab's streaming anomaly flags for every row of frame, updated with just the new
+        #   rows, so a tick never re-runs the detector over everything followed so far.
+        # - That and the summary are the only incremental parts. prepare_plot_data still copies every column and
+        #   converts every timestamp, and update_graph redoes the rolling lines, histograms and density grid for the
+        #   whole table, so each tick costs O(total rows) even when only a few rows arrived.
+        live = [w for w in self.plot_windows.values() if w.live]
+        if not live or not self.follow_var.get():
+            return
+        self.data_rows = frame
+        prepared = self._prepare_for_plot(quiet=True, flags=flags)  # Prepared once and shared by every live graph.
+        if prepared is None:
+            return
+        for window in live:
+            window.show(prepared, self._settings(), grow_only=True)
+            # - Usually only the data artists are redrawn; the whole figure only when the view has to grow. That
+            #   saves the render, not the O(total rows) preparation above.
 
-        ax.grid(True)  # Turn on gridlines for better readability and value estimation on the plot.
+    def _settings(self):  # (decimate, rolling, overlay, density threshold) as chosen in the tab, for draw_graph/update_graph.
+        try:
+            threshold = max(0, int(float(self.density_var.get())))
+        except ValueError:
+            threshold = DENSITY_THRESHOLD  # Half-typed or invalid entry: keep the default rather than fail the plot.
+        return self.decimate_var.get(), self.rolling_var.get(), self.overlay_var.get(), threshold
+        # - The drawing itself lives in greenhouse.py so the command line renders the same graphs.
 
 
 # To Run The Code
@@ -0,0 +1,710 @@
+# Throughput benchmarks for the data functions in greenhouse.py (used by Project.py and greenhouse_cli.py).
+# Run with:  python benchmark.py [rows]
+#        or:  python benchmark.py --suite [--sizes 1K,10K,1M,100M] [--json results.json] [--compare baseline.json]
+#   The suite generates data with synthetic.py and times every pipeline stage at each size (rows/s, peak RSS),
+#   plus the cold start: a fresh interpreter importing each entry point and opening the GUI's first window.
+# - Nothing here is imported by the GUI; it's a standalone script for measuring changes to the ingestion code.
+
+import csv  # Used by the legacy reader kept below as the baseline and to write the synthetic input file.
+import json  # The suite's results are saved as JSON so runs can be compared.
+import os  # Used to build temp file paths and clean them up.
+import sys  # Used to read the optional row count from the command line.
+import tempfile  # Creates a scratch directory so benchmark files never land in the repo.
+import time  # time.perf_counter gives a high resolution wall clock for timing.
+import tracemalloc  # Measures how many bytes Python allocates while building each data structure.
+from datetime import datetime, timedelta  # Used to generate timestamps and by the legacy reader.
+
+import numpy as np  # The legacy reader uses np.nan for missing values.
+
+import greenhouse  # The module under test (the data side of Project.py; importing it needs no display).
+import synthetic  # Realistic generated CSVs for the suite.
+
+
+def legacy_read_csv_file(filepath):  # The original three-pass, per-row-dict reader, kept only as a baseline to compare against.
+    rows = []
+    with open(filepath, newline='') as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        norm_fieldnames = [fn.lower().strip() for fn in fieldnames if fn]
+        expected_tokens = {'timestamp', 'temperature', 'temp', 'humidity', 'hum',
+                           'light', 'lux', 'greenhouse', 'gh', 'light_intensity'}
+        header_has_expected = any(any(tok in fn for tok in expected_tokens) for fn in norm_fieldnames)
+
+    def parse_ts(raw):
+        try:
+            return datetime.fromisoformat(raw)
+        except Exception:
+            try:
+                return datetime.strptime(raw, '%Y-%m-%d %H:%M:%S')
+            except Exception:
+                return None
+
+    def to_float(raw):
+        try:
+            return float(raw)
+        except Exception:
+            return np.nan
+
+    if header_has_expected:
+        with open(filepath, newline='') as f:
+            for r in csv.DictReader(f):
+                if not any((v and str(v).strip()) for v in r.values()):
+                    continue
+                row = {k.strip().lower(): v.strip() if isinstance(v, str) else v for k, v in r.items()}
+                timestamp = parse_ts(row['timestamp']) if row.get('timestamp') else None
+                rows.append({'timestamp': timestamp,
+                             'greenhouse': row.get('greenhouse', row.get('gh', 'unknown')),
+                             'temperature': to_float(row.get('temperature', row.get('temp', 'nan'))),
+                             'humidity': to_float(row.get('humidity', row.get('hum', 'nan'))),
+                             'light': to_float(row.get('light', row.get('light_intensity', row.get('lux', 'nan'))))})
+        return rows
+
+    with open(filepath, newline='') as f:
+        for cols in csv.reader(f):
+            if not cols or all((c is None or str(c).strip() == '') for c in cols):
+                continue
+            cols = [c.strip() for c in cols]
+            while len(cols) < 5:
+                cols.append('')
+            ts_raw, greenhouse, temp_raw, hum_raw, light_raw = cols[:5]
+            rows.append({'timestamp': parse_ts(ts_raw) if ts_raw else None,
+                         'greenhouse': greenhouse or 'unknown',
+                         'temperature': to_float(temp_raw) if temp_raw != '' else np.nan,
+                         'humidity': to_float(hum_raw) if hum_raw != '' else np.nan,
+                         'light': to_float(light_raw) if light_raw != '' else np.nan})
+    return rows
+
+
+def write_sample_csv(path, n_rows, n_greenhouses=4):  # Writes a synthetic greenhouse export with n_rows readings.
+    start = datetime(2025, 7, 1)
+    rng = np.random.default_rng(0)  # Fixed seed so every run benchmarks the same file.
+    temps = rng.normal(22, 3, n_rows).round(2)
+    hums = rng.normal(60, 8, n_rows).round(2)
+    lights = rng.normal(300, 40, n_rows).round(1)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'greenhouse', 'temperature', 'humidity', 'light_intensity'])
+        for i in range(n_rows):
+            ts = (start + timedelta(minutes=i)).strftime('%Y-%m-%d %H:%M:%S')
+            writer.writerow([ts, f'GH-{i % n_greenhouses + 1}', temps[i], hums[i], lights[i]])
+
+
+def timeit(label, func, *args, n_rows):  # Times one call of func(*args) and prints rows/sec.
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    print(f'{label:<32} {elapsed:8.3f} s  {n_rows / elapsed:14,.0f} rows/s')
+    return result, elapsed
+
+
+def bench_read_csv(n_rows):  # Compares the legacy reader, the new row reader and the columnar reader on one file.
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.csv')
+        write_sample_csv(path, n_rows)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f'read_csv_file: {n_rows:,} rows, {size_mb:.1f} MB')
+        _, t_old = timeit('legacy read_csv_file', legacy_read_csv_file, path, n_rows=n_rows)
+        _, t_rows = timeit('read_csv_file', greenhouse.read_csv_file, path, n_rows=n_rows)
+        _, t_cols = timeit('read_csv_columns', greenhouse.read_csv_columns, path, n_rows=n_rows)
+        print(f'speedup: read_csv_file x{t_old / t_rows:.2f}, read_csv_columns x{t_old / t_cols:.2f}')
+
+
+def bench_read_dir(n_rows, n_files=16):  # Compares serial and process-pool directory loading.
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(n_files):
+            write_sample_csv(os.path.join(tmp, f'gh_{i:03d}.csv'), n_rows // n_files)
+        print(f'read_csv_dir_columns: {n_rows:,} rows in {n_files} files, {os.cpu_count()} CPUs')
+        timeit('serial (workers=1)', greenhouse.read_csv_dir_columns, tmp, 1, n_rows=n_rows)
+        timeit('process pool (workers=None)', greenhouse.read_csv_dir_columns, tmp, None, n_rows=n_rows)
+
+
+
+def bench_memory(n_rows=10_000_000, dict_rows=500_000):  # Bytes per row: list of row dicts vs SensorFrame.
+    # - The list of dicts is measured on dict_rows rows (10M dicts need several GB); its cost per row is constant,
+    #   so the per-row figure is representative and the total is extrapolated to n_rows.
+    start = datetime(2025, 7, 1)
+    names = [f'GH-{i + 1}' for i in range(4)]
+
+    tracemalloc.start()
+    rows = [{'timestamp': start + timedelta(minutes=i), 'greenhouse': names[i % 4],
+             'temperature': 20.0 + i % 7 * 0.1, 'humidity': 50.0 + i % 11 * 0.1, 'light': 300.0 + i % 13}
+            for i in range(dict_rows)]
+    dict_bytes = tracemalloc.get_traced_memory()[0] / dict_rows
+    del rows
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    columns = {'timestamp': np.datetime64('2025-07-01', 'us') + np.arange(n_rows) * np.timedelta64(60, 's'),
+               'greenhouse': (np.arange(n_rows) % 4).astype(np.int32), 'greenhouse_categories': names}
+    for field in greenhouse.SENSOR_FIELDS:
+        columns[field] = np.full(n_rows, 20.0)
+    before = tracemalloc.get_traced_memory()[0]
+    frame = greenhouse.SensorFrame.from_columns(columns)
+    frame_bytes = (tracemalloc.get_traced_memory()[0] - before) / n_rows
+    tracemalloc.stop()
+
+    print(f'memory at {n_rows:,} rows')
+    print(f'list of row dicts  {dict_bytes:8.1f} bytes/row  (~{dict_bytes * n_rows / 1e9:.2f} GB)')
+    print(f'SensorFrame        {frame_bytes:8.1f} bytes/row  ({frame_bytes * n_rows / 1e9:.2f} GB, {len(frame):,} rows)')
+    print(f'reduction: x{dict_bytes / frame_bytes:.1f}')
+
+
+
+def legacy_parse_timestamps(values):  # Per-row fromisoformat/strptime parsing, as every timestamp used to be parsed.
+    out = []
+    for raw in values:
+        try:
+            ts = datetime.fromisoformat(raw)
+        except Exception:
+            try:
+                ts = datetime.strptime(raw, '%Y-%m-%d %H:%M:%S')
+            except Exception:
+                ts = None
+        out.append(ts)
+    return np.array([t.isoformat() if t is not None else 'NaT' for t in out], dtype='datetime64[us]')
+
+
+def bench_timestamps(n_rows):  # Rows/sec of timestamp parsing before and after, for each common layout.
+    start = datetime(2025, 7, 1)
+    print(f'timestamp parsing: {n_rows:,} values')
+    for layout in ('%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S'):
+        values = [(start + timedelta(minutes=i)).strftime(layout) for i in range(n_rows)]
+        values[::1000] = [''] * len(values[::1000])  # A sprinkling of missing values, as real exports have.
+        print(f'  layout {layout}')
+        _, t_old = timeit('    per-row fromisoformat', legacy_parse_timestamps, values, n_rows=n_rows)
+        _, t_new = timeit('    parse_timestamp_column', greenhouse.parse_timestamp_column, values, n_rows=n_rows)
+        print(f'    speedup x{t_old / t_new:.1f}')
+
+
+
+def legacy_save_sorted(rows, path):  # The old save_inserted: copy, lambda-key sort, one csv.writer call per row.
+    rows = list(rows)
+    rows.sort(key=lambda r: (np.nan if np.isnan(r['humidity']) else r['humidity']))
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'greenhouse', 'temperature', 'humidity', 'light'])
+        for r in rows:
+            ts = r['timestamp'].isoformat(sep=' ') if r['timestamp'] else ''
+            writer.writerow([ts, r['greenhouse'], r['temperature'], r['humidity'], r['light']])
+
+
+def bench_save(n_rows):  # Rows/sec of saving sorted by humidity: old path, in-memory save_sorted, external merge sort.
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'bench.csv')
+        write_sample_csv(src, n_rows)
+        frame = greenhouse.SensorFrame.from_columns(greenhouse.read_csv_columns(src))
+        out = os.path.join(tmp, 'out.csv')
+        print(f'save sorted by humidity: {n_rows:,} rows')
+        timeit('legacy sort + csv.writer', legacy_save_sorted, frame, out, n_rows=n_rows)
+        timeit('save_sorted (in memory)', greenhouse.save_sorted, out, frame.columns(), 'humidity', n_rows=n_rows)
+        timeit('save_sorted (8 spilled runs)', lambda: greenhouse.save_sorted(out, frame.columns(), 'humidity',
+                                                                         run_rows=n_rows // 8, tmp_dir=tmp), n_rows=n_rows)
+        timeit('save_sorted tsv (in memory)', lambda: greenhouse.save_sorted(out, frame.columns(), 'humidity', delimiter='\t'),
+               n_rows=n_rows)
+
+
+def bench_group(n_rows=10_000_000):  # Rows/sec of group_by for each bucket size on synthetic 3-second readings.
+    rng = np.random.default_rng(0)
+    columns = {'timestamp': np.datetime64('2025-01-01', 'us') + np.arange(n_rows) * np.timedelta64(3, 's'),
+               'greenhouse': (np.arange(n_rows) % 8).astype(np.int32), 'greenhouse_categories': [f'GH-{i + 1}' for i in range(8)]}
+    for field in greenhouse.SENSOR_FIELDS:
+        columns[field] = rng.normal(20, 3, n_rows)
+    print(f'group_by: {n_rows:,} rows, 8 greenhouses')
+    for bucket in greenhouse.RESAMPLE_BUCKETS:
+        table, _ = timeit(f'  {bucket}', greenhouse.group_by, columns, bucket, n_rows=n_rows)
+        print(f'{"":<34} {len(table["greenhouse"]):,} groups')
+
+
+def bench_rolling(n_rows=2_000_000):  # Rolling stats time for growing windows: should stay flat as the window grows.
+    rng = np.random.default_rng(0)
+    values = rng.normal(20, 3, n_rows)
+    regular = np.datetime64('2025-01-01', 'us') + np.arange(n_rows) * np.timedelta64(60, 's')
+    irregular = np.sort(np.datetime64('2025-01-01', 'us') + rng.integers(0, n_rows * 60, n_rows) * np.timedelta64(1, 's'))
+    print(f'rolling_stats: {n_rows:,} points')
+    for name, times in (('minute data', regular), ('irregular', irregular)):
+        for window in ('15 min', '1 hour', '1 day'):
+            timeit(f'  {name}, {window}', greenhouse.rolling_stats, values, greenhouse.ROLLING_WINDOWS[window], times,
+                   n_rows=n_rows)
+
+
+def bench_anomaly(n_rows=1_000_000):  # Readings/sec through the anomaly detector: one by one and vectorised.
+    rng = np.random.default_rng(0)
+    columns = {'timestamp': np.datetime64('2025-01-01', 'us') + np.arange(n_rows) * np.timedelta64(15, 's'),
+               'greenhouse': (np.arange(n_rows) % 4).astype(np.int32), 'greenhouse_categories': [f'GH-{i + 1}' for i in range(4)]}
+    for field, mean, std in (('temperature', 22, 0.5), ('humidity', 60, 2), ('light', 300, 30)):
+        columns[field] = rng.normal(mean, std, n_rows)
+    frame = greenhouse.SensorFrame.from_columns(columns)
+    few = min(n_rows, 100_000)  # The per-row path is measured on fewer rows; its cost per row is constant.
+    print(f'anomaly detection: {n_rows:,} readings, 4 greenhouses')
+    detector = greenhouse.AnomalyDetector()
+    timeit('  update() per row', lambda: [detector.update(r) for r in frame[:few]], n_rows=few)
+    timeit('  update_columns()', greenhouse.AnomalyDetector().update_columns, columns, n_rows=n_rows)
+
+
+def bench_quantiles(n_rows=10_000_000, parts=64):  # Quantile sketches: speed, merge cost, memory and rank error.
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.normal(22, 3, n_rows - n_rows // 4), rng.lognormal(3, 1, n_rows // 4)])
+    rng.shuffle(values)  # A skewed mixture, so the tails differ from a plain normal.
+    qs = np.array([q for _, q in greenhouse.SUMMARY_QUANTILES])
+    print(f'quantiles: {n_rows:,} values')
+    exact, _ = timeit('  np.quantile (all values held)', np.quantile, values, qs, n_rows=n_rows)
+    sketch = greenhouse.QuantileSketch()
+    timeit('  sketch update_batch', sketch.update_batch, values, n_rows=n_rows)
+    pieces = []
+    for chunk in np.array_split(values, parts):  # As if each part came from its own file or worker.
+        pieces.append(greenhouse.QuantileSketch())
+        pieces[-1].update_batch(chunk)
+    merged = greenhouse.QuantileSketch()
+    timeit(f'  merge {parts} sketches', lambda: [merged.merge(p) for p in pieces], n_rows=n_rows)
+    few = min(n_rows, 200_000)
+    single = greenhouse.QuantileSketch()
+    timeit('  update() per value', lambda: [single.update(v) for v in values[:few].tolist()], n_rows=few)
+    ordered = np.sort(values)
+    bound = 2 * np.pi * np.sqrt(qs * (1 - qs)) / greenhouse.QUANTILE_COMPRESSION
+    for label, s in (('one batch', sketch), ('merged', merged)):
+        est = s.quantiles(qs)
+        rank = (np.searchsorted(ordered, est) + np.searchsorted(ordered, est, side='right')) / 2 / n_rows
+        errors = ', '.join(f'{name} {abs(r - q) * 100:.4f}% (bound {b * 100:.2f}%)'
+                           for (name, q), r, b in zip(greenhouse.SUMMARY_QUANTILES, rank, bound))
+        print(f'  rank error, {label}: {errors}')
+    print(f'  exact: {np.round(exact, 3).tolist()}  sketch: {np.round(sketch.quantiles(qs), 3).tolist()}')
+    print(f'  memory: {sketch.nbytes() / 1e3:.1f} KB sketch vs {values.nbytes / 1e6:.0f} MB of values')
+
+
+def bench_tail(n_rows, appends=200, batch=50):  # Cost of following a growing file: idle polls and small appends.
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'live.csv')
+        write_sample_csv(path, n_rows)
+        tail = greenhouse.CsvTail(path)
+        print(f'live tail: {n_rows:,} row file, {appends} appends of {batch} rows')
+        timeit('  first poll (whole file)', tail.poll, n_rows=n_rows)
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            tail.poll()
+        print(f'  idle poll: {(time.perf_counter() - t0) * 1000:.3f} us each')  # 1000 polls, so ms total == us each.
+        lines = ''.join(f'2025-01-02 00:00:{i % 60:02d},GH-1,21.5,60.0,300\n' for i in range(batch))
+        t0 = time.perf_counter()
+        for _ in range(appends):
+            with open(path, 'a') as fh:
+                fh.write(lines)
+            tail.poll()
+        dt = time.perf_counter() - t0
+        print(f'  append + poll: {dt / appends * 1000:.3f} ms per batch, independent of the file size')
+        timeit('  full re-read (old per tick)', greenhouse.read_csv_columns, path, n_rows=n_rows)
+
+
+def bench_binary(n_rows):  # Write and re-load time of the same rows as CSV, NPZ and (with pyarrow) Parquet.
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, 'src.csv')
+        write_sample_csv(src, n_rows)
+        columns = greenhouse.read_csv_columns(src)
+        print(f'export formats: {n_rows:,} rows')
+        for ext in ('csv', 'npz', 'parquet'):
+            if ext == 'parquet' and not greenhouse.parquet_available():
+                print('  parquet: skipped (pyarrow not installed)')
+                continue
+            path = os.path.join(tmp, 'out.' + ext)
+            timeit(f'  save {ext}', greenhouse.save_columns, path, columns, n_rows=n_rows)
+            timeit(f'  load {ext}', greenhouse.read_csv_columns, path, n_rows=n_rows)
+            print(f'  {ext} size: {os.path.getsize(path) / n_rows:.1f} bytes/row')
+
+
+def bench_render(n_points=2_000_000):  # Time to draw a long time series raw vs decimated (Agg, no window needed).
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    rng = np.random.default_rng(0)
+    x = np.arange(n_points, dtype=float)
+    y = 22 + 3 * np.sin(x / 1440 * 2 * np.pi) + rng.normal(0, 0.5, n_points)  # Daily cycle plus sensor noise.
+    print(f'render: {n_points:,} points, 6x4 in figure at 100 dpi')
+    warm = Figure(figsize=(6, 4))
+    FigureCanvasAgg(warm)
+    warm.add_subplot(111).plot([0, 1])
+    warm.canvas.draw()  # First draw loads fonts etc.; keep that out of the timings.
+    for mode in ('Off', 'LTTB', 'Min/Max'):
+        fig = Figure(figsize=(6, 4))
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        t0 = time.perf_counter()
+        if mode == 'Off':
+            ax.plot(x, y)
+        else:
+            greenhouse.DecimatedLine(ax, x, y, mode)
+        canvas.draw()
+        elapsed = time.perf_counter() - t0
+        shown = len(ax.lines[0].get_xdata())
+        print(f'  {mode:<8} {elapsed * 1000:9.1f} ms  ({shown:,} points drawn)')
+        if mode != 'Off':
+            t0 = time.perf_counter()
+            ax.set_xlim(n_points * 0.4, n_points * 0.41)  # Zoom in to 1% of the series; triggers re-decimation.
+            canvas.draw()
+            print(f'  {"":<8} {(time.perf_counter() - t0) * 1000:9.1f} ms  zoomed redraw '
+                  f'({len(ax.lines[0].get_xdata()):,} points drawn)')
+
+
+def bench_scatter(n_points=1_000_000):  # Temperature vs humidity: one marker per reading vs the density heatmap.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    rng = np.random.default_rng(0)
+    temps = rng.normal(22, 3, n_points)
+    prepared = {'x': np.arange(n_points), 'dates_used': False, 'temps': temps,
+                'hums': 60 - 1.5 * (temps - 22) + rng.normal(0, 4, n_points), 'flags': None}
+    print(f'scatter: {n_points:,} points, 6x4 in figure at 100 dpi')
+    for label, threshold in (('markers', n_points), ('density', 0)):
+        prepared['cache'] = {}  # Nothing left over from the other mode.
+        fig = Figure(figsize=(6, 4))
+        canvas = FigureCanvasAgg(fig)
+        t0 = time.perf_counter()
+        greenhouse.draw_graph(fig.add_subplot(111), 'temp_hum_scatter', prepared, density_threshold=threshold)
+        canvas.draw()
+        print(f'  {label:<8} {(time.perf_counter() - t0) * 1000:9.1f} ms')
+
+
+def bench_live_update(n_rows=200_000, batches=20, batch=200):  # Live graph refresh: rebuild vs in-place update + blit.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'src.csv')
+        write_sample_csv(path, n_rows + batches * batch)
+        frame = greenhouse.SensorFrame.from_columns(greenhouse.read_csv_columns(path), copy=False)
+    keys = ('temp_ts', 'hum_hist')
+    print(f'live graphs: {", ".join(keys)} on {n_rows:,} rows, {batches} appends of {batch} rows')
+    sizes = [n_rows + i * batch for i in range(1, batches + 1)]
+    prepared = [greenhouse.prepare_plot_data(frame.take(np.arange(m))) for m in sizes]  # Not part of the timings.
+
+    fig = Figure(figsize=(7, 8))
+    canvas = FigureCanvasAgg(fig)
+    axes = fig.subplots(len(keys), 1)
+    t0 = time.perf_counter()
+    for p in prepared:  # What live graphs used to do: clear the axes, draw everything again, render the whole figure.
+        for ax, key in zip(axes, keys):
+            ax.clear()
+            greenhouse.draw_graph(ax, key, p)
+        canvas.draw()
+    print(f'  rebuild + full draw   {(time.perf_counter() - t0) / batches * 1000:9.1f} ms per update')
+
+    fig = Figure(figsize=(7, 8))
+    canvas = FigureCanvasAgg(fig)
+    axes = fig.subplots(len(keys), 1)
+    first = greenhouse.prepare_plot_data(frame.take(np.arange(n_rows)))
+    handles = [greenhouse.draw_graph(ax, key, first) for ax, key in zip(axes, keys)]
+    artists = [(ax, a) for ax, h in zip(axes, handles) for a in greenhouse.graph_artists(h)]
+    for _ax, artist in artists:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+    full = 0
+    t0 = time.perf_counter()
+    for p in prepared:  # What PlotWindow does: update the artists, blit them unless the view had to grow.
+        changed = [greenhouse.update_graph(ax, h, p, grow_only=True) for ax, h in zip(axes, handles)]
+        if any(changed):
+            full += 1
+            canvas.draw()
+            background = canvas.copy_from_bbox(fig.bbox)
+        else:
+            canvas.restore_region(background)
+        for ax, artist in artists:
+            ax.draw_artist(artist)
+        canvas.blit(fig.bbox)
+    print(f'  update + blit         {(time.perf_counter() - t0) / batches * 1000:9.1f} ms per update '
+          f'({full} of {batches} needed a full draw)')
+
+
+def bench_profiler(n_rows):  # Cost of the stage profiler on a CSV load: off, on, with tracemalloc, with cProfile.
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'src.csv')
+        write_sample_csv(path, n_rows)
+        profiler = greenhouse.PROFILER
+        print(f'stage profiler: {n_rows:,} row CSV load')
+        t0 = time.perf_counter()
+        for _ in range(1_000_000):
+            with profiler.stage('noop'):
+                pass
+        print(f'  disabled stage: {(time.perf_counter() - t0) * 1000:.1f} ns each')  # 1M stages, so ms total == ns each.
+        for label, options in (('off', (False, False, False)), ('stages', (True, False, False)),
+                               ('stages + tracemalloc', (True, True, False)), ('stages + cProfile', (True, False, True))):
+            profiler.configure(*options)
+            timeit(f'  {label}', greenhouse.read_csv_columns, path, n_rows=n_rows)
+        profiler.configure(False, False, False)
+        profiler.clear()
+
+
+STARTUP_IMPORTS = ('greenhouse', 'greenhouse_cli', 'Project', 'matplotlib.backends.backend_tkagg')
+# - What the CSV worker processes, the command line and the GUI import before doing anything; the last one is what
+#   the first graph window costs now that Project.py imports Matplotlib lazily.
+
+FIRST_WINDOW_CODE = 'import time, Project; app = Project.CowApp(); app.update(); print(time.time()); app.destroy()'
+# - Starts the GUI the way python Project.py does and prints the wall clock once the main window has been drawn.
+
+
+def _python(code, *options):  # Runs code in a fresh interpreter from this directory; returns the CompletedProcess.
+    import subprocess
+    return subprocess.run([sys.executable, *options, '-c', code], capture_output=True, text=True, timeout=300,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):  # (seconds, {direct import: seconds}) for 'import module' in a fresh interpreter, or None.
+    # - Parsed from python -X importtime, which prints one line per module after its imports finish:
+    #   'import time: self [us] | cumulative | name', with the name indented two spaces per level of nesting.
+    proc = _python(f'import {module}', '-X', 'importtime')
+    if proc.returncode != 0:
+        return None
+    total, children, pending = 0.0, {}, {}
+    for line in proc.stderr.splitlines():
+        parts = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # The header line, or something else written to stderr.
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2  # 0 for imports made by the -c code itself.
+        seconds = int(parts[1]) / 1e6
+        name = name.strip()
+        if depth == 1:
+            pending[name] = seconds
+        elif depth == 0:
+            if name == module or module.startswith(name + '.'):  # 'import a.b' imports a, then a.b, both at depth 0.
+                total += seconds
+                children.update(pending)
+                if name == module:
+                    return total, children
+            pending = {}  # Children of the line just finished; an unrelated one (site, encodings) isn't counted.
+    return None
+
+
+def first_window_seconds():  # Seconds from launching a fresh interpreter to the GUI's first drawn window; None if no display.
+    t0 = time.time()
+    proc = _python(FIRST_WINDOW_CODE)
+    if proc.returncode != 0:
+        return None  # Usually a TclError: no display to open the window on.
+    return float(proc.stdout.split()[-1]) - t0
+
+
+def startup_seconds(repeat=5):  # {measurement: seconds}, the fastest of `repeat` fresh interpreters for each.
+    # - Measurements: 'interpreter' (python -c pass), one per STARTUP_IMPORTS module named by its last part, and
+    #   'first_window' where a display is available.
+    # - The first run of each also leaves compiled .pyc files behind, as a first start after an update would.
+    best = {}
+
+    def keep(name, seconds):
+        if seconds is not None:
+            best[name] = min(best.get(name, seconds), seconds)
+
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        _python('pass')
+        keep('interpreter', time.perf_counter() - t0)
+        for module in STARTUP_IMPORTS:
+            found = import_times(module)
+            keep(module.rsplit('.', 1)[-1], found and found[0])
+        keep('first_window', first_window_seconds())
+    return best
+
+
+def bench_startup(repeat=5, top=6):  # Cold start: interpreter, imports of each entry point, and the GUI's first window.
+    print(f'startup (fastest of {repeat} fresh interpreters)')
+    best = startup_seconds(repeat)
+    for name, seconds in best.items():
+        print(f'  {name:<22} {seconds * 1000:8.1f} ms')
+    if 'first_window' not in best:
+        print('  first window: skipped, Tk could not open a window (no display?)')
+    for module in STARTUP_IMPORTS[:3]:
+        found = import_times(module)
+        if found:
+            heaviest = sorted(found[1].items(), key=lambda kv: -kv[1])[:top]
+            print(f'  {module} imports: ' + ', '.join(f'{name} {sec * 1000:.0f} ms' for name, sec in heaviest))
+
+
+# Benchmark suite: every pipeline stage at several sizes, saved as JSON for comparing versions
+SUITE_VERSION = 1  # Bumped whenever the JSON layout changes.
+SUITE_SIZES = '1K,10K,100K,1M'  # Default sizes; up to 100M works, given the disk space and RAM for it.
+ROW_DICT_LIMIT = 2_000_000  # Stages that build one dict per row are skipped above this many rows.
+REGRESSION_THRESHOLD = 0.10  # A stage more than 10% slower (rows/s) than the baseline counts as a regression.
+MIN_COMPARE_SECONDS = 0.01  # Stages faster than this in the baseline are too noisy to call regressions on.
+SUITE_REPEAT = 3  # Each stage runs this many times and the fastest run is kept, which filters out noise.
+
+
+def parse_size(text):  # '1K' -> 1000, '2.5M' -> 2500000, '1e6' -> 1000000.
+    text = text.strip().upper()
+    scale = {'K': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9}.get(text[-1:], 1)
+    return int(float(text[:-1] if scale != 1 else text) * scale)
+
+
+def _proc_status_mb(key):  # A VmRSS/VmHWM line of /proc/self/status in MB, or None where /proc doesn't exist.
+    try:
+        with open('/proc/self/status') as fh:
+            for line in fh:
+                if line.startswith(key + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():  # Starts a new peak-RSS measurement; True if the OS supports it (Linux 4.0+).
+    try:
+        with open('/proc/self/clear_refs', 'w') as fh:
+            fh.write('5')  # '5' resets the peak resident set size (VmHWM) to the current one.
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb():  # Peak resident memory in MB: since reset_peak_rss() on Linux, since process start elsewhere.
+    peak = _proc_status_mb('VmHWM')
+    if peak is None:
+        import resource  # Unix only; ru_maxrss is KB on Linux but bytes on macOS.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return peak
+
+
+def measure(size, stage, func, rows, n_bytes=None, repeat=1):  # Times one stage; returns (result, record for the JSON).
+    # - With repeat > 1 the fastest run is recorded; the peak RSS covers all runs.
+    rss_before = _proc_status_mb('VmRSS')
+    exact_peak = reset_peak_rss()
+    seconds = float('inf')
+    for _ in range(repeat):
+        result = None  # Drop the previous run's result first, so two don't sit in memory at once.
+        t0 = time.perf_counter()
+        result = func()
+        seconds = min(seconds, time.perf_counter() - t0)
+    record = {'size': size, 'stage': stage, 'rows': rows, 'seconds': seconds,
+              'rows_per_s': rows / seconds if seconds else None,
+              'mb_per_s': n_bytes / 1e6 / seconds if n_bytes and seconds else None,
+              'rss_before_mb': rss_before, 'peak_rss_mb': peak_rss_mb(), 'peak_is_per_stage': exact_peak,
+              'repeat': repeat}
+    print(f'  {stage:<22} {seconds:9.3f} s {record["rows_per_s"] or 0:14,.0f} rows/s  peak {record["peak_rss_mb"]:8.1f} MB')
+    return result, record
+
+
+def _draw_plots(frame):  # The plotting path without a window: prepare the arrays, draw two graphs, render with Agg.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    prepared = greenhouse.prepare_plot_data(frame)
+    fig = Figure(figsize=(8, 6))
+    canvas = FigureCanvasAgg(fig)
+    for i, key in enumerate(('temp_ts', 'temp_hist')):
+        greenhouse.draw_graph(fig.add_subplot(2, 1, i + 1), key, prepared)
+    canvas.draw()
+
+
+def run_suite(sizes, n_files=8, n_greenhouses=4, header='canonical', missing=0.01, tmp_dir=None, repeat=SUITE_REPEAT,
+              startup=True):
+    # Generates data of each size and times every stage on it; returns the result document.
+    # - startup adds the cold-start times as size 0 stages. rows is 1, so rows/s is starts per second and --compare
+    #   flags a slower start like any other regression.
+    results = []
+    if startup:
+        print('suite: startup')
+        for name, seconds in startup_seconds(repeat).items():
+            results.append({'size': 0, 'stage': 'startup.' + name, 'rows': 1, 'seconds': seconds,
+                            'rows_per_s': 1 / seconds, 'mb_per_s': None, 'repeat': repeat})
+            print(f'  {name:<22} {seconds * 1000:8.1f} ms')
+    for size in sizes:
+        print(f'suite: {size:,} rows in {n_files} files')
+        with tempfile.TemporaryDirectory(dir=tmp_dir, prefix='greenhouse-bench-') as tmp:
+            files, rec = measure(size, 'generate', lambda: synthetic.generate_dataset(
+                tmp, size, n_files, n_greenhouses, header, missing), size)
+            n_bytes = sum(b for _, _, b in files)
+            rec['mb_per_s'] = n_bytes / 1e6 / rec['seconds']
+            results.append(rec)
+            first_path, first_rows, first_bytes = files[0]
+            if size <= ROW_DICT_LIMIT:  # One dict per row: the old data model, only feasible at small sizes.
+                results.append(measure(size, 'read_csv_file', lambda: greenhouse.read_csv_file(first_path),
+                                       first_rows, first_bytes, repeat)[1])
+                results.append(measure(size, 'read_all_csv_in_dir', lambda: greenhouse.read_all_csv_in_dir(tmp),
+                                       size, n_bytes, repeat)[1])
+            (columns, _report), rec = measure(size, 'read_csv_dir_columns',
+                                              lambda: greenhouse.read_csv_dir_columns(tmp), size, n_bytes, repeat)
+            results.append(rec)
+        frame = greenhouse.SensorFrame.from_columns(columns, copy=False)
+        stages = [('compute_summaries', lambda: greenhouse.compute_summaries(frame)),
+                  ('rows_to_numpy', lambda: greenhouse.rows_to_numpy(frame)),
+                  ('group_by', lambda: greenhouse.group_by(columns, 'Hour')),
+                  ('plot', lambda: _draw_plots(frame))]
+        for stage, func in stages:
+            results.append(measure(size, stage, func, size, repeat=repeat)[1])
+        frame = columns = stages = None  # Free this size's data before generating the next, larger one.
+    return {'suite_version': SUITE_VERSION, 'created': datetime.now().isoformat(timespec='seconds'),
+            'environment': environment(), 'params': {'files': n_files, 'greenhouses': n_greenhouses, 'header': header,
+                                                     'missing': missing},
+            'results': results}
+
+
+def environment():  # Where the numbers were measured, so results from different machines aren't mixed up.
+    import platform
+    import subprocess
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'commit': commit}
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):  # Prints rows/s against a baseline; returns regressions.
+    base = {(r['size'], r['stage']): r for r in baseline['results']}
+    regressions = []
+    print(f'compared with {baseline["environment"].get("commit")} ({baseline["created"]})')
+    for r in results['results']:
+        old = base.get((r['size'], r['stage']))
+        if not old or not old['rows_per_s'] or not r['rows_per_s'] or old['seconds'] < MIN_COMPARE_SECONDS:
+            continue
+        ratio = r['rows_per_s'] / old['rows_per_s']
+        mark = ''
+        if ratio < 1 - threshold:
+            mark = '  <-- slower'
+            regressions.append(r)
+        print(f'  {r["size"]:>12,} {r["stage"]:<22} {ratio:6.2f}x{mark}')
+    return regressions
+
+
+def main_suite(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description='Time every pipeline stage at several data sizes.')
+    parser.add_argument('--suite', action='store_true')
+    parser.add_argument('--sizes', default=SUITE_SIZES, help='comma separated row counts, e.g. 1K,1M,100M')
+    parser.add_argument('--files', type=int, default=8)
+    parser.add_argument('--greenhouses', type=int, default=4)
+    parser.add_argument('--header', choices=list(synthetic.HEADER_VARIANTS), default='canonical')
+    parser.add_argument('--missing', type=float, default=0.01)
+    parser.add_argument('--repeat', type=int, default=SUITE_REPEAT, help='runs per stage; the fastest is kept')
+    parser.add_argument('--no-startup', action='store_true', help="don't time interpreter start and imports")
+    parser.add_argument('--tmp-dir', help='where the generated CSVs go (needs ~45 bytes per row)')
+    parser.add_argument('--json', help='save the results to this file')
+    parser.add_argument('--compare', help='a previous --json file; exits with 1 if any stage got slower')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+    results = run_suite([parse_size(s) for s in args.sizes.split(',')], args.files, args.greenhouses, args.header,
+                        args.missing, args.tmp_dir, args.repeat, not args.no_startup)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(results, fh, indent=2)
+    if args.compare:
+        with open(args.compare) as fh:
+            if compare(results, json.load(fh), args.threshold):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    if '--suite' in sys.argv:
+        sys.exit(main_suite(sys.argv[1:]))
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    bench_read_csv(rows)
+    bench_read_dir(rows)
+    bench_timestamps(rows)
+    bench_save(rows)
+    bench_memory()
+    bench_group()
+    bench_rolling()
+    bench_anomaly()
+    bench_quantiles()
+    bench_tail(rows)
+    bench_binary(rows)
+    bench_render()
+    bench_scatter()
+    bench_live_update()
+    bench_profiler(rows)
+    bench_startup()
@@ -0,0 +1,292 @@
+# Command line entry point for batch runs of the greenhouse pipeline (no window, no display needed).
+# Run with:  python greenhouse_cli.py INPUT [INPUT ...] [options]      (python greenhouse_cli.py -h lists the options)
+# - INPUT is a CSV (or .npz/.parquet export) file or a directory of CSVs; several are combined in the order given.
+# - Only greenhouse.py and the standard library are imported, never tkinter. Matplotlib (Agg backend) is imported only
+#   when --plot is used, so a run that just summarises starts in a fraction of a second.
+#
+# Exit codes:
+#   0  success
+#   1  some input files failed to parse; everything else was processed and written
+#   2  bad command line (argparse's own exit code)
+#   3  nothing to process: a missing input, or no readings in any input
+#   4  the run failed part way (an unreadable file, an output that couldn't be written, ...)
+
+import argparse  # Parses the command line and prints the usage message on errors.
+import csv  # Writes the summary as CSV.
+import json  # Writes the report (summary, groups, timings) as JSON.
+import os
+import sys
+import time  # time.perf_counter times each stage.
+
+import numpy as np
+
+from greenhouse import (RESAMPLE_BUCKETS, GRAPH_OPTIONS, DECIMATE_MODES, DENSITY_THRESHOLD, ROLLING_WINDOWS,
+                        PROFILER, ROLLING_OVERLAYS, SUMMARY_QUANTILES, AnomalyDetector, CsvCache, SensorFrame,
+                        SensorSummary, concat_columns, draw_graph, group_by, group_table_columns, load_csv_dir_cached,
+                        load_csv_file_cached, prepare_plot_data, read_csv_columns, read_csv_dir_columns, save_columns,
+                        save_group_table)
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_NO_DATA = 3
+EXIT_FAILED = 4
+
+
+class StageTimes:  # Wall time of each named pipeline stage, in the order the stages ran.
+    def __init__(self):
+        self.seconds = {}
+        self._t0 = time.perf_counter()
+
+    def stage(self, name):  # Context manager: with times.stage('load'): ...
+        return _Stage(self, name)
+
+    def as_dict(self):  # {stage: seconds, ..., 'total': seconds since the run started}.
+        return dict(self.seconds, total=time.perf_counter() - self._t0)
+
+
+class _Stage:
+    def __init__(self, times, name):
+        self.times = times
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        self.times.seconds[self.name] = self.times.seconds.get(self.name, 0.0) + elapsed  # Repeated stages add up.
+        return False
+
+
+def _json_number(v):  # JSON has no NaN, so missing statistics are written as null.
+    v = float(v)
+    return None if np.isnan(v) else v
+
+
+LABEL_OPTIONS = {'group': RESAMPLE_BUCKETS, 'decimate': DECIMATE_MODES, 'rolling': ROLLING_WINDOWS,
+                 'overlay': ROLLING_OVERLAYS}
+# - Options whose values are the GUI's labels. They are matched in any case (--group day or --group Day) and turned
+#   back into the label by parse_args, since the data functions look the labels up as written.
+
+
+def _lowered(labels):  # Lower-cased label -> label.
+    return {label.lower(): label for label in labels}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Summarise, group and plot greenhouse sensor CSVs without the GUI.')
+    parser.add_argument('inputs', nargs='+', metavar='INPUT', help='CSV file or directory of CSV files')
+    parser.add_argument('-o', '--output', default='-',
+                        help='where the summary goes (default: stdout). A .csv name, or --format csv, writes CSV; '
+                             'anything else gets the JSON report')
+    parser.add_argument('--format', choices=('json', 'csv'),
+                        help='output format; defaults to the --output extension, else json')
+    parser.add_argument('--group', type=str.lower, choices=list(_lowered(RESAMPLE_BUCKETS)),
+                        help='also compute per-greenhouse statistics per hour/day/week')
+    parser.add_argument('--groups-output',
+                        help='write the whole group table to this CSV (or .tsv) file instead of into the JSON report')
+    parser.add_argument('--export', help='also save the combined readings: .npz or .parquet (binary columns, fast to '
+                                         're-load), .csv or .tsv')
+    parser.add_argument('--plot', nargs='+', type=str.lower, choices=[key for _label, key in GRAPH_OPTIONS],
+                        metavar='GRAPH', help='render these graphs: ' + ', '.join(key for _label, key in GRAPH_OPTIONS))
+    parser.add_argument('--plot-dir', default='.', help='directory the rendered graphs are saved in (default: .)')
+    parser.add_argument('--plot-format', default='png', help='image format for graphs, e.g. png, svg, pdf')
+    parser.add_argument('--decimate', type=str.lower, choices=list(_lowered(DECIMATE_MODES)),
+                        default=DECIMATE_MODES[0], help='time series decimation (default: %(default)s)')
+    parser.add_argument('--rolling', type=str.lower, choices=list(_lowered(ROLLING_WINDOWS)),
+                        default='Off', help='rolling window overlay on time series (default: %(default)s)')
+    parser.add_argument('--overlay', type=str.lower, choices=list(_lowered(ROLLING_OVERLAYS)),
+                        default=ROLLING_OVERLAYS[1], help='what the rolling overlay draws (default: %(default)s)')
+    parser.add_argument('--density-threshold', type=int, default=DENSITY_THRESHOLD, metavar='N',
+                        help='draw the scatter plot as a density heatmap above N readings (default: %(default)s)')
+    parser.add_argument('--anomalies', action='store_true', help='run the anomaly detector and report flagged rows')
+    parser.add_argument('--workers', type=int, help='worker processes for directories (default: one per CPU)')
+    parser.add_argument('--no-cache', action='store_true', help="don't read or write the parse cache")
+    parser.add_argument('--refresh', action='store_true', help='re-parse inputs even if the cache is up to date')
+    parser.add_argument('--timings', action='store_true', help='print the per-stage timing breakdown to stderr')
+    parser.add_argument('--profile', metavar='JSON',
+                        help='record the fine-grained stage profile (rows, rows/s, bytes) and write it to this file')
+    parser.add_argument('--profile-memory', action='store_true', help='with --profile: also track peak memory per stage')
+    parser.add_argument('--profile-functions', action='store_true',
+                        help='with --profile: also keep a cProfile listing of each top-level stage')
+    return parser
+
+
+def load_inputs(paths, workers=None, use_cache=True, refresh=False):  # Reads every input; returns (columns, summary, files).
+    # - files: one {'path', 'rows', 'error'} entry per CSV that was read (from a directory report or a single file).
+    # - The cache makes repeated nightly runs over unchanged directories a memory map instead of a re-parse.
+    cache = CsvCache() if use_cache else None
+    parts, files = [], []
+    summary = SensorSummary()
+    for path in paths:
+        if os.path.isdir(path):
+            if cache is not None:
+                columns, report = load_csv_dir_cached(path, cache, refresh=refresh, workers=workers)
+            else:
+                columns, report = read_csv_dir_columns(path, workers=workers)
+            summary.merge(report['summary'])
+            if report.get('cached'):
+                files.append({'path': path, 'rows': report['rows'], 'error': None, 'cached': True})
+            else:
+                files.extend({'path': f['path'], 'rows': f['rows'], 'error': f['error'], 'cached': False}
+                             for f in report['files'])
+        else:
+            if cache is not None:
+                columns, file_summary, hit = load_csv_file_cached(path, cache, refresh=refresh)
+            else:
+                columns, file_summary, hit = read_csv_columns(path), None, False
+            summary.merge(file_summary if file_summary is not None else SensorSummary().add_columns(columns))
+            files.append({'path': path, 'rows': len(columns['timestamp']), 'error': None, 'cached': hit})
+        parts.append(columns)
+    return concat_columns(parts), summary, files
+
+
+SUMMARY_COLUMNS = ['field', 'count', 'mean', 'std', 'min', 'max'] + [name for name, _q in SUMMARY_QUANTILES]
+
+
+def summary_rows(summary):  # The summary as [field, count, mean, std, min, max, median, p95, p99] rows.
+    return [[field] + [s[k] for k in SUMMARY_COLUMNS[1:]] for field, s in summary.as_dict().items()]
+
+
+def group_records(table):  # A group_by table as a list of JSON-ready dicts, one per group.
+    keys = group_table_columns()
+    stamps = [s.replace('T', ' ') for s in np.datetime_as_string(table['bucket'], unit='s').tolist()]
+    columns = [table[k].tolist() for k in keys[2:]]
+    return [dict(zip(keys, [str(gh), ts] + [v if isinstance(v, int) else _json_number(v) for v in values]))
+            for gh, ts, *values in zip(table['greenhouse'], stamps, *columns)]
+
+
+def render_plots(columns, keys, out_dir, fmt, flags, decimate, rolling, overlay, times,
+                 density_threshold=DENSITY_THRESHOLD):
+    # Saves one image per graph key; returns the paths written.
+    with times.stage('plot_import'):
+        import matplotlib
+        matplotlib.use('Agg')  # No display: render straight to image files.
+        from matplotlib.figure import Figure  # A bare Figure avoids pyplot's global figure registry.
+    with times.stage('plot_prepare'):
+        prepared = prepare_plot_data(SensorFrame.from_columns(columns, copy=False), flags)
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    for key in keys:
+        with times.stage('plot_render'):
+            fig = Figure(figsize=(8, 4.5))
+            ax = fig.add_subplot(111)
+            draw_graph(ax, key, prepared, decimate, rolling, overlay, density_threshold)
+            fig.tight_layout()
+            path = os.path.join(out_dir, f'{key}.{fmt}')
+            fig.savefig(path, dpi=100)
+        written.append(path)
+    return written
+
+
+def write_csv_summary(fh, summary):
+    writer = csv.writer(fh)
+    writer.writerow(SUMMARY_COLUMNS)
+    writer.writerows(summary_rows(summary))
+
+
+def run(args):  # Runs the pipeline for parsed arguments; returns the exit code.
+    times = StageTimes()
+    if args.profile:
+        PROFILER.configure(True, args.profile_memory, args.profile_functions)
+    missing = [p for p in args.inputs if not os.path.exists(p)]
+    if missing:
+        print(f'error: no such file or directory: {", ".join(missing)}', file=sys.stderr)
+        return EXIT_NO_DATA
+
+    with times.stage('load'):
+        columns, summary, files = load_inputs(args.inputs, args.workers, not args.no_cache, args.refresh)
+    n = len(columns['timestamp'])
+    failed = [f for f in files if f['error']]
+    for f in failed:
+        print(f"error: {f['path']}: {f['error']}", file=sys.stderr)
+    if n == 0:
+        print('error: no readings found in the inputs', file=sys.stderr)
+        return EXIT_NO_DATA
+
+    report = {'rows': n, 'files': files, 'failed': len(failed),
+              'greenhouses': list(dict.fromkeys(columns['greenhouse_categories']))}
+
+    with times.stage('summary'):
+        report['summary'] = {field: {k: _json_number(v) if k != 'count' else v for k, v in s.items()}
+                             for field, s in summary.as_dict().items()}
+        report['greenhouse_quantiles'] = {gh: {field: {k: _json_number(v) if k != 'count' else v for k, v in s.items()}
+                                               for field, s in fields.items()}
+                                          for gh, fields in summary.greenhouse_quantiles().items()}
+        # - Medians and percentiles come from the bounded-memory sketches (see QuantileSketch for the error bound).
+
+    flags = None
+    if args.anomalies:
+        with times.stage('anomalies'):
+            flags = AnomalyDetector().update_columns(columns)
+        report['anomalies'] = int(np.count_nonzero(flags))
+
+    if args.group:
+        with times.stage('group'):
+            table = group_by(columns, args.group)
+        report['group_bucket'] = args.group
+        report['groups'] = len(table['greenhouse'])
+        with times.stage('write_groups'):
+            if args.groups_output:
+                delimiter = '\t' if os.path.splitext(args.groups_output)[1].lower() in ('.tsv', '.txt') else ','
+                save_group_table(args.groups_output, table, delimiter)
+                report['groups_output'] = args.groups_output
+            else:
+                report['group_table'] = group_records(table)
+
+    if args.export:
+        with times.stage('export'):
+            save_columns(args.export, columns, summary=summary)
+        report['export'] = args.export
+
+    if args.plot:
+        report['plots'] = render_plots(columns, args.plot, args.plot_dir, args.plot_format, flags,
+                                       args.decimate, args.rolling, args.overlay, times, args.density_threshold)
+
+    fmt = args.format or ('csv' if args.output.lower().endswith('.csv') else 'json')
+    with times.stage('write'):
+        out = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+        try:
+            if fmt == 'csv':
+                write_csv_summary(out, summary)
+            else:
+                report['timings'] = times.as_dict()  # As complete as it can be: only this write is missing.
+                json.dump(report, out, indent=2)
+                out.write('\n')
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    if args.timings:
+        for name, seconds in times.as_dict().items():
+            print(f'{name:<14} {seconds:8.3f} s', file=sys.stderr)
+    if args.profile:
+        PROFILER.save_json(args.profile)
+        if args.timings:
+            print(PROFILER.format_report(), file=sys.stderr)
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+def parse_args(argv=None):  # build_parser().parse_args with the LABEL_OPTIONS values mapped back to their labels.
+    args = build_parser().parse_args(argv)  # Exits with EXIT_USAGE itself on a bad command line.
+    for name, labels in LABEL_OPTIONS.items():
+        value = getattr(args, name)
+        if value is not None:
+            setattr(args, name, _lowered(labels)[value])
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return run(args)
+    except KeyboardInterrupt:
+        return 130  # The usual shell code for an interrupted command.
+    except Exception as e:
+        print(f'error: {type(e).__name__}: {e}', file=sys.stderr)
+        return EXIT_FAILED
+
+
+if __name__ == '__main__':  # The guard is also what keeps worker processes from re-running the CLI on import.
+    sys.exit(main())
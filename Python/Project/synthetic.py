@@ -0,0 +1,116 @@
+# Synthetic greenhouse sensor data, for benchmarks and for trying the program on realistic sizes.
+# Run with:  python synthetic.py OUT_DIR --rows 1000000 [--files 8] [--greenhouses 4] [--header canonical]
+#                                        [--missing 0.01] [--interval 60] [--seed 0]
+# - Readings follow a daily cycle: temperature peaks mid afternoon, humidity moves against it, light is zero at night.
+#   Each greenhouse has its own offset, and every reading gets sensor noise.
+# - Data is generated and written chunk by chunk, so 100M rows need no more memory than 1M.
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+HEADER_VARIANTS = {
+    'canonical': ['timestamp', 'greenhouse', 'temperature', 'humidity', 'light'],
+    'short': ['timestamp', 'gh', 'temp', 'hum', 'lux'],  # Synonyms the header-aware reader maps onto the same columns.
+    'old': ['timestamp', 'temperature', 'humidity', 'light_intensity'],
+    # - The Old_Greenhouse export: one greenhouse per file, no greenhouse column, timestamps without seconds.
+    'none': None,  # No header row: timestamp, greenhouse, temperature, humidity, light by position.
+}
+
+CHUNK_ROWS = 1_000_000  # Rows generated and formatted at a time.
+
+
+def synth_columns(gh, slot, n_greenhouses, rng, start, interval=60, missing=0.0):  # One block of readings as columns.
+    # - gh: greenhouse number of each row; slot: its reading number, so the timestamp is start + slot * interval.
+    # - missing: fraction of sensor cells left empty (NaN); a tenth of that fraction of timestamps is missing too.
+    n = len(gh)
+    ts = np.datetime64(start, 's') + slot.astype(np.int64) * np.timedelta64(int(interval), 's')
+    day = (slot * interval % 86400) / 86400.0  # Time of day as a fraction, 0 at midnight.
+    offset = (np.arange(n_greenhouses) * 1.5 - n_greenhouses * 0.5)[gh]  # Each greenhouse runs a bit warmer or cooler.
+    temps = 22 + offset + 5 * np.sin(2 * np.pi * (day - 0.375)) + rng.normal(0, 0.4, n)  # Peaks around 15:00.
+    hums = np.clip(62 - 1.8 * (temps - 22 - offset) + rng.normal(0, 2.5, n), 15, 100)
+    lights = np.clip(900 * np.sin(np.pi * (day - 0.25) / 0.5), 0, None) + np.abs(rng.normal(0, 15, n))
+    columns = {'timestamp': ts.astype('datetime64[us]'), 'greenhouse': gh.astype(np.int32),
+               'greenhouse_categories': [f'GH-{i + 1}' for i in range(n_greenhouses)],
+               'temperature': temps.round(2), 'humidity': hums.round(2), 'light': lights.round(1)}
+    if missing:
+        for field in ('temperature', 'humidity', 'light'):
+            columns[field][rng.random(n) < missing] = np.nan
+        columns['timestamp'][rng.random(n) < missing / 10] = np.datetime64('NaT')
+    return columns
+
+
+def format_csv(columns, header, newline='\n'):  # The rows of a column block as CSV text in one header variant's layout.
+    ts = columns['timestamp']
+    text = np.datetime_as_string(ts, unit='m' if header == 'old' else 's')
+    text = np.char.replace(text, 'T', ' ')
+    text[np.isnat(ts)] = ''
+    fields = [text.tolist()]
+    if header != 'old':
+        fields.append(np.asarray(columns['greenhouse_categories'], dtype=object)[columns['greenhouse']].tolist())
+    fields += [list(map(repr, columns[f].tolist())) for f in ('temperature', 'humidity', 'light')]
+    out = newline.join(map(','.join, zip(*fields))) + newline
+    return out.replace(',nan', ',')  # Missing readings are empty cells, as the loggers write them.
+
+
+def generate_dataset(out_dir, n_rows, n_files=1, n_greenhouses=4, header='canonical', missing=0.0, interval=60,
+                     start='2025-07-01', seed=0, chunk_rows=CHUNK_ROWS):  # Writes n_rows readings into CSV files.
+    """
+    Write n_rows synthetic readings split over n_files CSV files in out_dir
+    and return [(path, rows, bytes)] in file order.
+
+    Greenhouses report every `interval` seconds. With a greenhouse column
+    (every header variant except 'old') each file holds a contiguous stretch
+    of time with all greenhouses interleaved. With 'old' each file holds one
+    greenhouse, as the old exports did, so there are at least n_greenhouses
+    files. The same arguments and seed always produce identical files.
+    """
+    if header not in HEADER_VARIANTS:
+        raise ValueError(f'Unknown header variant {header!r}; choose from {", ".join(HEADER_VARIANTS)}')
+    if header == 'old':
+        n_files = max(n_files, n_greenhouses) // n_greenhouses * n_greenhouses  # A whole number of files per greenhouse.
+    os.makedirs(out_dir, exist_ok=True)
+    bounds = np.linspace(0, n_rows, n_files + 1).astype(np.int64)  # File f gets rows bounds[f]:bounds[f + 1].
+    written = []
+    for f in range(n_files):
+        path = os.path.join(out_dir, f'greenhouse_{f + 1:04d}.csv')
+        rng = np.random.default_rng([seed, f])  # Seeded per file, so files don't depend on chunk size or each other.
+        with open(path, 'w', newline='') as fh:
+            if HEADER_VARIANTS[header]:
+                fh.write(','.join(HEADER_VARIANTS[header]) + '\n')
+            for lo in range(bounds[f], bounds[f + 1], chunk_rows):
+                i = np.arange(lo, min(lo + chunk_rows, bounds[f + 1]))
+                if header == 'old':
+                    gh = np.full(len(i), f % n_greenhouses)
+                    slot = i - bounds[f] + (f // n_greenhouses) * (n_rows // n_files)
+                    # - Consecutive files of the same greenhouse continue where the previous one stopped.
+                else:
+                    gh, slot = i % n_greenhouses, i // n_greenhouses
+                block = synth_columns(gh, slot, n_greenhouses, rng, start, interval, missing)
+                fh.write(format_csv(block, header))
+        written.append((path, int(bounds[f + 1] - bounds[f]), os.path.getsize(path)))
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write synthetic multi-greenhouse sensor CSV files.')
+    parser.add_argument('out_dir')
+    parser.add_argument('--rows', type=float, default=1e6, help='total readings over all files (default 1e6)')
+    parser.add_argument('--files', type=int, default=1)
+    parser.add_argument('--greenhouses', type=int, default=4)
+    parser.add_argument('--header', choices=list(HEADER_VARIANTS), default='canonical')
+    parser.add_argument('--missing', type=float, default=0.0, help='fraction of empty sensor cells, e.g. 0.01')
+    parser.add_argument('--interval', type=int, default=60, help='seconds between readings of one greenhouse')
+    parser.add_argument('--start', default='2025-07-01')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    files = generate_dataset(args.out_dir, int(args.rows), args.files, args.greenhouses, args.header, args.missing,
+                             args.interval, args.start, args.seed)
+    print(f'{sum(r for _, r, _ in files):,} rows, {sum(b for _, _, b in files) / 1e6:.1f} MB in {len(files)} files')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
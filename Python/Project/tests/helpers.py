@@ -0,0 +1,21 @@
+import numpy as np
+
+from greenhouse import SENSOR_FIELDS
+
+
+def random_columns(n, greenhouses=('gh1', 'gh2', 'gh3'), seed=0, missing=0.05):  # Shuffled readings over ~10 days.
+    # - Timestamps are unique (so "latest reading" is never a tie), some values are NaN and some timestamps NaT.
+    rng = np.random.default_rng(seed)
+    ts = np.datetime64('2024-03-01T00:00', 'us') + rng.choice(10 * 24 * 3600, n, replace=False) * np.timedelta64(1, 's')
+    ts[rng.random(n) < missing] = np.datetime64('NaT')
+    columns = {'timestamp': ts, 'greenhouse': rng.integers(0, len(greenhouses), n).astype(np.int32),
+               'greenhouse_categories': list(greenhouses)}
+    for field, (mean, std) in zip(SENSOR_FIELDS, ((21, 3), (65, 8), (400, 300))):
+        values = rng.normal(mean, std, n).round(1)  # Rounded, so repeated values (and stuck runs) happen too.
+        values[rng.random(n) < missing] = np.nan
+        columns[field] = values
+    return columns
+
+
+def slice_columns(columns, rows):  # The given rows (an index array or slice) of a column dict.
+    return dict(columns, **{key: columns[key][rows] for key in ('timestamp', 'greenhouse') + SENSOR_FIELDS})
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from greenhouse import SENSOR_FIELDS, AnomalyDetector, anomaly_bit
+
+from helpers import random_columns, slice_columns
+
+
+def _night(n=600, light=0.0):  # One greenhouse, one reading a minute, steady temperature and humidity.
+    return {'timestamp': np.datetime64('2024-06-01T20:00', 'us') + np.arange(n) * np.timedelta64(60, 's'),
+            'greenhouse': np.zeros(n, dtype=np.int32), 'greenhouse_categories': ['gh1'],
+            'temperature': 18.0 + 0.1 * np.sin(np.arange(n) / 7), 'humidity': 70.0 + 0.5 * np.cos(np.arange(n) / 5),
+            'light': np.full(n, light)}
+
+
+def test_dark_night_is_not_stuck():  # 10 hours of 0 lux is a normal night, not a flatlined light sensor.
+    columns = _night()
+    assert not np.any(AnomalyDetector(stuck=30).update_columns(columns))
+    detector = AnomalyDetector(stuck=30)
+    assert not any(detector.update({'timestamp': columns['timestamp'][i], 'greenhouse': 'gh1',
+                                    'temperature': columns['temperature'][i], 'humidity': columns['humidity'][i],
+                                    'light': 0.0}) for i in range(len(columns['timestamp'])))
+
+
+def test_flatlined_light_is_still_stuck():  # Any other value held that long is still flagged.
+    flags = AnomalyDetector(stuck=30).update_columns(_night(light=350.0))
+    assert np.count_nonzero(flags & anomaly_bit('light', 'stuck')) == 600 - 29
+
+
+def test_stuck_exempt_can_be_switched_off():
+    flags = AnomalyDetector(stuck=30, stuck_exempt={'light': ()}).update_columns(_night())
+    assert np.count_nonzero(flags & anomaly_bit('light', 'stuck')) == 600 - 29
+
+
+def _rows(columns):  # The row dicts update() takes, in the same order.
+    names = columns['greenhouse_categories']
+    return [{'timestamp': columns['timestamp'][i], 'greenhouse': names[columns['greenhouse'][i]],
+             **{field: columns[field][i] for field in SENSOR_FIELDS}}
+            for i in range(len(columns['timestamp']))]
+
+
+def test_update_columns_matches_update():  # The vectorised path gives the flags of feeding rows one by one.
+    columns = random_columns(4000, missing=0.05)
+    columns['light'][1000:1100] = 0.0  # A dark spell (exempt) and a flatline (flagged) in the mix.
+    columns['humidity'][2000:2100] = 71.3
+    one_by_one = AnomalyDetector(warmup=10, stuck=20)
+    expected = np.array([one_by_one.update(row) for row in _rows(columns)], dtype=np.uint16)
+    assert np.any(expected)
+
+    batched = AnomalyDetector(warmup=10, stuck=20)
+    bounds = [0, 1, 7, 1500, 1501, 4000]  # Batches of every size, so state must carry across calls.
+    flags = np.concatenate([batched.update_columns(slice_columns(columns, slice(lo, hi)))
+                            for lo, hi in zip(bounds[:-1], bounds[1:])])
+    assert np.array_equal(flags, expected)
+    for key, state in one_by_one.states.items():  # And both end in the same state, ready for the next reading.
+        other = batched.states[key]
+        assert (state.count, state.last_ts, state.run) == (other.count, other.last_ts, other.run)
+        assert (state.mean, state.var, state.last) == pytest.approx((other.mean, other.var, other.last), rel=1e-9)
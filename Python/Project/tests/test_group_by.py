@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+from greenhouse import GROUP_STATS, SENSOR_FIELDS, group_by
+
+from helpers import random_columns
+
+
+def _bucket(t, bucket):  # Naive bucket start of one datetime.
+    if bucket == 'Hour':
+        return t.replace(minute=0, second=0, microsecond=0)
+    day = t.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day if bucket == 'Day' else day - timedelta(days=day.weekday())
+
+
+def _naive_group_by(columns, bucket):  # {(greenhouse, bucket start): {field_stat: value}} with plain Python.
+    groups = {}
+    for i, ts in enumerate(columns['timestamp'].tolist()):
+        if ts is None:
+            continue
+        key = (columns['greenhouse_categories'][columns['greenhouse'][i]], _bucket(ts, bucket))
+        groups.setdefault(key, []).append((ts, i))
+    out = {}
+    for key, members in groups.items():
+        stats = {}
+        for field in SENSOR_FIELDS:
+            readings = [(ts, columns[field][i]) for ts, i in members if not np.isnan(columns[field][i])]
+            values = np.array([v for _ts, v in readings])
+            stats[f'{field}_count'] = len(values)
+            if len(values):
+                stats.update({f'{field}_mean': values.mean(), f'{field}_std': values.std(), f'{field}_min': values.min(),
+                              f'{field}_max': values.max(), f'{field}_last': max(readings)[1]})
+            else:
+                stats.update({f'{field}_{stat}': np.nan for stat in GROUP_STATS if stat != 'count'})
+        out[key] = stats
+    return out
+
+
+@pytest.mark.parametrize('bucket', ['Hour', 'Day', 'Week'])
+@pytest.mark.parametrize('chunk_rows', [10 ** 9, 997])
+def test_matches_naive_group_by(bucket, chunk_rows):
+    columns = random_columns(5000)
+    table = group_by(columns, bucket, chunk_rows=chunk_rows)
+    expected = _naive_group_by(columns, bucket)
+    keys = list(zip(table['greenhouse'], table['bucket'].tolist()))
+    assert keys == sorted(expected)  # Every group once, ordered by greenhouse then bucket.
+    for row, key in enumerate(keys):
+        for name, value in expected[key].items():
+            assert table[name][row] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), (key, name)
+    assert table['skipped'] == int(np.isnat(columns['timestamp']).sum())
+
+
+def test_chunks_of_an_iterable_are_merged():  # A list of column dicts groups like their concatenation.
+    parts = [random_columns(2000, seed=s) for s in range(3)]
+    parts[1]['greenhouse_categories'] = ['gh3', 'gh1', 'gh2']  # Each part may number its greenhouses differently.
+    whole = {key: np.concatenate([p[key] for p in parts]) for key in ('timestamp', 'temperature', 'humidity', 'light')}
+    whole['greenhouse_categories'] = ['gh1', 'gh2', 'gh3']
+    remap = [np.arange(3), np.array([2, 0, 1]), np.arange(3)]
+    whole['greenhouse'] = np.concatenate([remap[k][p['greenhouse']] for k, p in enumerate(parts)]).astype(np.int32)
+    merged, direct = group_by(parts, 'Day'), group_by(whole, 'Day')
+    assert merged['greenhouse'] == direct['greenhouse']
+    for name in direct:
+        if name not in ('greenhouse', 'skipped'):
+            np.testing.assert_allclose(merged[name].astype(float), direct[name].astype(float), rtol=1e-9, equal_nan=True)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from greenhouse import QUANTILE_COMPRESSION, SENSOR_FIELDS, QuantileSketch, SensorSummary
+
+from helpers import random_columns
+
+QS = (0.001, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 0.999)
+
+
+def _datasets():
+    rng = np.random.default_rng(1)
+    n = 200_000
+    return {'normal': rng.normal(20, 3, n), 'skewed': rng.lognormal(5, 1.2, n),
+            'bimodal': np.concatenate([rng.normal(0, 1, n // 2), rng.normal(50, 5, n // 2)]),
+            'sorted': np.sort(rng.normal(0, 1, n))}
+    # - The data shapes the QuantileSketch error bound is documented for.
+
+
+def _within(values, q, estimate):  # True when the estimate lies between the exact quantiles at q -/+ the bound.
+    b = 2 * np.pi * np.sqrt(q * (1 - q)) / QUANTILE_COMPRESSION + 1e-4
+    lo, hi = np.quantile(values, [max(0.0, q - b), min(1.0, q + b)], method='inverted_cdf')
+    return lo <= estimate <= hi
+
+
+@pytest.mark.parametrize('name', list(_datasets()))
+def test_one_batch_within_bound(name):
+    values = _datasets()[name]
+    sketch = QuantileSketch()
+    sketch.update_batch(values)
+    for q, estimate in zip(QS, sketch.quantiles(np.array(QS))):
+        assert _within(values, q, estimate), (name, q)
+    assert sketch.count == len(values)
+    assert sketch.quantile(0.0) == values.min() and sketch.quantile(1.0) == values.max()
+
+
+@pytest.mark.parametrize('name', list(_datasets()))
+def test_merged_and_streamed_within_bound(name):
+    values = _datasets()[name]
+    merged = QuantileSketch()
+    for part in np.array_split(values, 37):  # Like per-file sketches merged after a parallel load.
+        sketch = QuantileSketch()
+        sketch.update_batch(part)
+        merged.merge(sketch)
+    streamed = QuantileSketch()
+    for v in values[:20_000]:
+        streamed.update(v)
+    for q in QS:
+        assert _within(values, q, merged.quantile(q)), (name, q)
+        assert _within(values[:20_000], q, streamed.quantile(q)), (name, q)
+
+
+def test_small_input_is_exact():
+    values = np.array([5.0, 1.0, 4.0, 2.0, 3.0, np.nan, np.inf])
+    sketch = QuantileSketch()
+    sketch.update_batch(values)
+    assert sketch.count == 5  # Non-finite values are ignored.
+    assert sketch.quantiles(np.array([0.0, 0.5, 1.0])).tolist() == [1.0, 3.0, 5.0]
+
+
+def test_state_round_trip():
+    sketch = QuantileSketch()
+    sketch.update_batch(_datasets()['skewed'])
+    copy = QuantileSketch.from_state(sketch.to_state())
+    assert np.array_equal(copy.quantiles(np.array(QS)), sketch.quantiles(np.array(QS)))
+
+
+def test_summary_sketches_per_greenhouse():  # add_columns gives each greenhouse the sketch of just its own readings.
+    columns = random_columns(20_000, greenhouses=('a', 'b', 'c', 'unused'))
+    columns['greenhouse'][columns['greenhouse'] == 3] = 0  # A category without rows gets no sketch.
+    rng = np.random.default_rng(3)
+    for field in SENSOR_FIELDS:  # Unrounded values, like _datasets (the bound is for data without heavy ties).
+        columns[field] = np.where(np.isnan(columns[field]), np.nan, rng.lognormal(3, 1, len(columns[field])))
+    summary = SensorSummary().add_columns(columns)
+    assert sorted(summary.sketches) == ['a', 'b', 'c']
+    for code, greenhouse in enumerate('abc'):
+        for field in SENSOR_FIELDS:
+            values = columns[field][columns['greenhouse'] == code]
+            values = values[~np.isnan(values)]
+            sketch = summary.sketch(field, greenhouse)
+            assert sketch.count == len(values)
+            assert all(_within(values, q, sketch.quantile(q)) for q in QS), (greenhouse, field)
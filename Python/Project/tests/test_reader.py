@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from greenhouse import read_csv_columns
+
+ROWS = ['2024-05-01 08:00:00,GH-1,21.5,60.2,350',
+        '2024-05-01 08:01:00,GH-2,21.7,,360',
+        '2024-05-01 08:02:00,GH-1,21.6,60.0,']
+
+
+def _write(tmp_path, lines):
+    path = tmp_path / 'readings.csv'
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def _check(columns):
+    assert len(columns['timestamp']) == 3
+    assert columns['timestamp'][0] == np.datetime64('2024-05-01T08:00:00', 'us')
+    assert [columns['greenhouse_categories'][c] for c in columns['greenhouse']] == ['GH-1', 'GH-2', 'GH-1']
+    np.testing.assert_array_equal(columns['temperature'], [21.5, 21.7, 21.6])
+    np.testing.assert_array_equal(columns['humidity'], [60.2, np.nan, 60.0])
+    np.testing.assert_array_equal(columns['light'], [350, 360, np.nan])
+
+
+def test_headerless_file_is_positional(tmp_path):  # 'GH-1' contains the header token 'gh', but the row is data.
+    _check(read_csv_columns(_write(tmp_path, ROWS)))
+
+
+@pytest.mark.parametrize('header', ['timestamp,greenhouse,temperature,humidity,light', 'timestamp,gh,temp,hum,lux'])
+def test_header_is_recognised(tmp_path, header):
+    _check(read_csv_columns(_write(tmp_path, [header] + ROWS)))
+
+
+def test_header_columns_in_any_order(tmp_path):
+    lines = ['light,humidity,temperature,greenhouse,timestamp'] + [','.join(reversed(r.split(','))) for r in ROWS]
+    _check(read_csv_columns(_write(tmp_path, lines)))
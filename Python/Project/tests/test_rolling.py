@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from greenhouse import rolling_stats
+
+
+def _naive_rolling(values, window, times=None, min_periods=1):  # Each point's window collected with a plain loop.
+    out = {stat: np.full(len(values), np.nan) for stat in ('mean', 'std', 'min', 'max')}
+    for i in range(len(values)):
+        if times is None:
+            members = values[max(0, i - window + 1):i + 1]
+        elif np.isnat(times[i]):
+            continue
+        else:
+            inside = ~np.isnat(times) & (times > times[i] - window) & (times <= times[i])
+            members = values[inside]
+        members = members[~np.isnan(members)]
+        if len(members) >= max(1, min_periods):
+            out['mean'][i], out['std'][i] = members.mean(), members.std()
+            out['min'][i], out['max'][i] = members.min(), members.max()
+    return out
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(300, 40, n).round(0)
+    values[rng.random(n) < 0.1] = np.nan
+    values[100:160] = 250.0  # A flat stretch: its std must come out as exactly 0.
+    return values
+
+
+def _check(result, expected):
+    for stat in expected:
+        np.testing.assert_allclose(result[stat], expected[stat], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=stat)
+
+
+@pytest.mark.parametrize('window', [1, 7, 50, 5000])
+def test_count_window_matches_naive(window):
+    values = _series(1000)
+    _check(rolling_stats(values, window, min_periods=3), _naive_rolling(values, window, min_periods=3))
+
+
+@pytest.mark.parametrize('minutes', [1, 15, 240])
+def test_time_window_matches_naive(minutes):
+    rng = np.random.default_rng(2)
+    values = _series(1000)
+    gaps = rng.exponential(90, 1000).astype(np.int64) + 1  # Irregular sampling with the odd long gap.
+    times = np.datetime64('2024-01-01', 'us') + np.cumsum(gaps) * np.timedelta64(1, 's')
+    times[rng.random(1000) < 0.03] = np.datetime64('NaT')
+    shuffled = rng.permutation(1000)  # rolling_stats doesn't need the times in order.
+    window = np.timedelta64(minutes, 'm')
+    _check(rolling_stats(values[shuffled], window, times[shuffled]),
+           _naive_rolling(values[shuffled], window, times[shuffled]))
+
+
+def test_flat_window_has_zero_std():
+    stats = rolling_stats(np.full(200, 312.7), 20)
+    assert (stats['std'] == 0).all()
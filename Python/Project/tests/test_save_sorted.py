@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import greenhouse
+from greenhouse import SENSOR_FIELDS, read_csv_columns, save_sorted
+
+from helpers import random_columns, slice_columns
+
+
+def _naive_order(columns, key, descending):  # Stable sort with NaN/NaT last, using Python's sorted().
+    values = columns[key]
+    missing = np.isnat(values) if values.dtype.kind == 'M' else np.isnan(values)
+    present = [i for i in range(len(values)) if not missing[i]]
+    present = sorted(present, key=lambda i: values[i], reverse=descending)  # reverse=True is stable too.
+    return np.array(present + [i for i in range(len(values)) if missing[i]], dtype=np.int64)
+
+
+def _read_back(path, columns, order):  # Checks the saved file holds exactly the input rows in `order`.
+    saved = read_csv_columns(str(path))
+    assert len(saved['timestamp']) == len(order)  # No row lost or duplicated.
+    names = np.array(saved['greenhouse_categories'])[saved['greenhouse']]
+    expected = np.array(columns['greenhouse_categories'])[columns['greenhouse'][order]]
+    assert (names == expected).all()
+    ts = columns['timestamp'][order]
+    assert ((saved['timestamp'] == ts) | (np.isnat(saved['timestamp']) & np.isnat(ts))).all()
+    for field in SENSOR_FIELDS:
+        np.testing.assert_array_equal(saved[field], columns[field][order], err_msg=field)
+
+
+@pytest.fixture
+def run_sizes(monkeypatch):  # Lengths of the runs each save_sorted call merged.
+    sizes = []
+    merge = greenhouse._merge_runs
+
+    def recording(runs, block_rows):
+        sizes.append([len(run) for run in runs])
+        return merge(runs, block_rows)
+
+    monkeypatch.setattr(greenhouse, '_merge_runs', recording)
+    return sizes
+
+
+@pytest.mark.parametrize('key, descending', [('humidity', False), ('light', True), ('timestamp', False)])
+def test_one_big_dict_is_cut_into_runs(tmp_path, run_sizes, key, descending):
+    columns = random_columns(10_000)
+    out = tmp_path / 'sorted.csv'
+    assert save_sorted(str(out), columns, key, descending, run_rows=1_250, tmp_dir=str(tmp_path)) == 10_000
+    assert run_sizes == [[1_250] * 8]  # Eight spilled runs, none bigger than run_rows.
+    _read_back(out, columns, _naive_order(columns, key, descending))
+
+
+def test_many_dicts_fill_runs_across_dict_boundaries(tmp_path, run_sizes):
+    columns = random_columns(5_000)
+    parts = [slice_columns(columns, slice(lo, hi)) for lo, hi in ((0, 300), (300, 2_900), (2_900, 3_000), (3_000, 5_000))]
+    out = tmp_path / 'parts.csv'
+    assert save_sorted(str(out), parts, 'temperature', run_rows=1_000) == 5_000
+    assert run_sizes == [[1_000] * 5]
+    _read_back(out, columns, _naive_order(columns, 'temperature', False))
+
+
+def test_small_input_sorts_in_memory(tmp_path, run_sizes):
+    columns = random_columns(800)
+    out = tmp_path / 'sorted.csv'
+    assert save_sorted(str(out), columns, 'humidity') == 800
+    assert run_sizes == []  # Nothing spilled, so nothing to merge.
+    _read_back(out, columns, _naive_order(columns, 'humidity', False))
+    assert save_sorted(str(out), columns, None, run_rows=300) == 800  # key=None keeps the input order.
+    _read_back(out, columns, np.arange(800))
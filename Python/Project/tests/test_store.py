@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+
+from greenhouse import SENSOR_FIELDS, STORE_RECORD, SensorStore
+
+from helpers import random_columns, slice_columns
+
+
+def _naive_store(batches):  # {(greenhouse, timestamp): values}; the first reading of a timestamp is the one kept.
+    kept = {}
+    for columns in batches:
+        for i, ts in enumerate(columns['timestamp']):
+            if np.isnat(ts):
+                continue
+            key = (columns['greenhouse_categories'][columns['greenhouse'][i]], int(ts.astype(np.int64)))
+            kept.setdefault(key, tuple(float(columns[field][i]) for field in SENSOR_FIELDS))
+    return kept
+
+
+def _stored(store):  # The same mapping read back from a store, checking each segment is in timestamp order.
+    columns = store.load_columns()
+    out = {}
+    for name in store.greenhouses():
+        ts = store.scan(name)['timestamp']
+        assert (ts[1:] > ts[:-1]).all(), name  # Strictly increasing: sorted and one reading per timestamp.
+    for i, ts in enumerate(columns['timestamp']):
+        key = (columns['greenhouse_categories'][columns['greenhouse'][i]], int(ts.astype(np.int64)))
+        out[key] = tuple(float(columns[field][i]) for field in SENSOR_FIELDS)
+    return out
+
+
+def _same(a, b):  # Mapping equality with NaN == NaN.
+    return a.keys() == b.keys() and all(np.allclose(a[k], b[k], equal_nan=True, rtol=0, atol=0) for k in a)
+
+
+def test_out_of_order_batches_match_naive(tmp_path):
+    columns = random_columns(6000)
+    order = np.argsort(columns['timestamp'])
+    columns = slice_columns(columns, order)
+    batches = [slice_columns(columns, np.arange(3000, 6000)), slice_columns(columns, np.arange(0, 3000)),  # Older batch second.
+               slice_columns(columns, np.arange(1000, 4000))]  # Overlaps both: every reading already stored.
+    store = SensorStore(str(tmp_path), fsync='never')
+    reports = [store.append_columns(b) for b in batches]
+    assert _same(_stored(store), _naive_store(batches))
+    assert reports[2]['stored'] == 0 and reports[2]['conflicting'] == 0
+    assert reports[2]['repeated'] == int((~np.isnat(batches[2]['timestamp'])).sum())
+    assert sum(r['stored'] for r in reports) == len(_naive_store(batches))
+
+
+def test_conflicts_are_counted_and_named(tmp_path):
+    columns = random_columns(500, greenhouses=('gh1',), missing=0)
+    store = SensorStore(str(tmp_path), fsync='never')
+    store.append_columns(columns)
+    changed = dict(columns, temperature=columns['temperature'] + 1.0)
+    report = store.append_columns(changed)
+    assert (report['stored'], report['repeated'], report['conflicting']) == (0, 0, 500)
+    assert len(report['conflicts']) > 0 and all(gh == 'gh1' for gh, _ts in report['conflicts'])
+    assert _same(_stored(store), _naive_store([columns]))  # The reading stored first wins.
+
+    twice = slice_columns(changed, np.r_[np.arange(10), np.arange(10)])  # Repeated inside one batch: kept once.
+    twice['timestamp'] = twice['timestamp'] + np.timedelta64(3650, 'D')
+    report = store.append_columns(twice)
+    assert (report['stored'], report['repeated']) == (10, 10)
+
+
+def test_repair_after_crash(tmp_path):
+    columns = random_columns(1000, missing=0)
+    store = SensorStore(str(tmp_path))
+    store.append_columns(columns)
+    store.close()
+    before = _stored(SensorStore(str(tmp_path)))
+
+    segment = os.path.join(str(tmp_path), sorted(f for f in os.listdir(tmp_path) if f.endswith('.bin'))[0])
+    with open(segment, 'ab') as fh:
+        fh.write(b'\x01' * (STORE_RECORD.itemsize // 2))  # A record cut off part way by the crash.
+    with open(segment + '.tmp', 'wb') as fh:
+        fh.write(b'half a rewrite')  # A merge that never got renamed over the segment.
+
+    reopened = SensorStore(str(tmp_path))
+    assert not os.path.exists(segment + '.tmp')
+    assert _same(_stored(reopened), before)
+    assert reopened.append_columns(columns)['repeated'] == 1000  # Still usable, and nothing was lost.
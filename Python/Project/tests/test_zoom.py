@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('matplotlib')
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from greenhouse import DecimatedLine, SensorFrame, draw_graph, prepare_plot_data, update_graph  # noqa: E402
+from helpers import random_columns  # noqa: E402
+
+
+def _axes():  # One axes on an off-screen canvas, like the one a PlotWindow embeds.
+    fig = Figure(figsize=(6, 3))
+    FigureCanvasAgg(fig)
+    return fig.subplots()
+
+
+@pytest.mark.parametrize('mode', ['LTTB', 'Min/Max'])
+def test_decimated_line_refines_on_zoom(mode):
+    ax = _axes()
+    x = np.arange(200_000, dtype=float)
+    y = np.sin(x / 50.0)
+    ax.set_xlim(x[0], x[-1])
+    line = DecimatedLine(ax, x, y, mode)
+    overview = line.line.get_xdata()
+    assert len(overview) < 5000
+
+    ax.set_xlim(1000, 1400)  # What the toolbar's zoom and pan do.
+    shown = line.line.get_xdata()
+    inside = shown[(shown >= 1000) & (shown <= 1400)]
+    assert len(inside) == 401  # Few enough points in view to draw every one of them.
+    assert len(overview[(overview >= 1000) & (overview <= 1400)]) < 20
+    np.testing.assert_array_equal(line.line.get_ydata()[(shown >= 1000) & (shown <= 1400)], y[1000:1401])
+
+    ax.set_xlim(x[0], x[-1])  # Zooming back out decimates the whole series again.
+    assert len(line.line.get_xdata()) == len(overview)
+
+
+def _prepared(columns, rows):
+    frame = SensorFrame()
+    frame.extend({k: v if k == 'greenhouse_categories' else v[:rows] for k, v in columns.items()})
+    return prepare_plot_data(frame)
+
+
+@pytest.mark.parametrize('key', ['temp_ts', 'temp_hist', 'temp_hum_scatter'])
+def test_live_update_keeps_a_zoomed_view(key):
+    columns = random_columns(4000, missing=0)
+    ax = _axes()
+    handle = draw_graph(ax, key, _prepared(columns, 2000))
+    x0, x1 = ax.get_xlim()
+    zoom = (x0 + (x1 - x0) * 0.25, x0 + (x1 - x0) * 0.5)
+    ax.set_xlim(*zoom)
+    ylim = ax.get_ylim()
+
+    more = _prepared(columns, 4000)
+    assert update_graph(ax, handle, more, grow_only=True, keep_view=True) is not None
+    assert ax.get_xlim() == zoom and ax.get_ylim() == ylim
+    update_graph(ax, handle, more, grow_only=False)  # Without keep_view the view is fitted to the data again.
+    assert ax.get_xlim() != zoom